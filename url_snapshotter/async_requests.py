@@ -6,9 +6,15 @@ import aiohttp
 import asyncio
 import structlog
 from aiohttp import ClientError
+from collections.abc import AsyncIterator
 
 logger = structlog.get_logger()
 
+# Seconds that resolved host names and idle keep-alive connections are kept for reuse;
+# longer than aiohttp's defaults, so consecutive snapshots skip DNS lookups and handshakes
+_DNS_CACHE_TTL = 300
+_KEEPALIVE_TIMEOUT = 30
+
 
 async def fetch_url(
     session: aiohttp.ClientSession, url: str, max_retries: int = 3
@@ -22,8 +28,9 @@ async def fetch_url(
         max_retries (int, optional): The maximum number of retries in case of failure. Defaults to 3.
 
     Returns:
-        dict: A dictionary containing the URL, HTTP status code, and content. If an error occurs,
-              the HTTP status code and content will be None.
+        dict: A dictionary containing the URL, HTTP status code, the undecoded content as bytes,
+              and the encoding to decode it with. If an error occurs, the HTTP status code and
+              content will be None.
 
     Raises:
         ClientError: If there is an error with the client request.
@@ -31,16 +38,23 @@ async def fetch_url(
         Exception: For any other unexpected errors.
     """
 
-    logger.debug(f"Fetching URL: {url}")
+    logger.debug("Fetching URL", url=url)
     retries = 0
 
     while retries < max_retries:
         try:
             async with session.get(url) as response:
-                content = await response.text()
+                # The body is decoded by the worker process that cleans it, which keeps
+                # decoding off the event loop
+                content = await response.read()
                 http_code = response.status
-                logger.debug(f"Fetched {url} with HTTP code {http_code}")
-                return {"url": url, "http_code": http_code, "content": content}
+                logger.debug("Fetched URL", url=url, http_code=http_code)
+                return {
+                    "url": url,
+                    "http_code": http_code,
+                    "content": content,
+                    "encoding": response.get_encoding(),
+                }
 
         except (ClientError, asyncio.TimeoutError) as e:
             retries += 1
@@ -55,62 +69,87 @@ async def fetch_url(
     return {"url": url, "http_code": None, "content": None}
 
 
-async def fetch_all_urls(
-    urls: list[str], concurrent: int, max_retries: int = 3
-) -> list[dict]:
+def create_session(concurrent: int) -> aiohttp.ClientSession:
     """
-    Fetches content from a list of URLs asynchronously with a specified level of concurrency and retry attempts.
+    Create an aiohttp session configured for fetching URLs.
+
+    The session should be created from within a running event loop and can be reused
+    across calls to fetch_all_urls, so DNS lookups, pooled connections and TLS sessions
+    carry over between snapshots.
 
     Args:
-        urls (list[str]): A list of URLs to fetch.
-        concurrent (int): The maximum number of concurrent requests.
-        max_retries (int, optional): The maximum number of retry attempts for each URL. Defaults to 3.
+        concurrent (int): The maximum number of concurrent connections.
 
     Returns:
-        list[dict]: A list of dictionaries containing the results of the fetch operations.
+        aiohttp.ClientSession: A new client session.
     """
 
-    results = []
-    connector = aiohttp.TCPConnector(limit=concurrent)
+    connector = aiohttp.TCPConnector(
+        limit=concurrent,
+        ttl_dns_cache=_DNS_CACHE_TTL,
+        keepalive_timeout=_KEEPALIVE_TIMEOUT,
+    )
     timeout = aiohttp.ClientTimeout(total=5)  # Set a 5-second timeout for each request
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
 
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-        logger.info(f"Starting to fetch {len(urls)} URLs with concurrency {concurrent}")
-
-        tasks = [fetch_url(session, url, max_retries=max_retries) for url in urls]
-
-        # Use asyncio.gather to collect all results with exception handling
-        completed_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for index, result in enumerate(completed_results):
-            if isinstance(result, Exception):
-                logger.error(
-                    f"Task {index+1}/{len(urls)}: Encountered an exception: {result}"
-                )
-            else:
-                logger.debug(f"Task {index+1}/{len(urls)}: Completed successfully.")
-            process_task_result(result, results)
-
-        logger.info(f"Completed fetching {len(urls)} URLs.")
 
-    return results
-
-
-def process_task_result(task_result: dict, results: list[dict]):
+async def fetch_all_urls(
+    urls: list[str],
+    concurrent: int,
+    max_retries: int = 3,
+    session: aiohttp.ClientSession | None = None,
+) -> AsyncIterator[dict]:
     """
-    Processes the result of a task and appends it to the results list if it contains content.
+    Fetches content from a list of URLs asynchronously with a specified level of concurrency and retry attempts.
+
+    Results are yielded as soon as each fetch completes, so the caller can process a page
+    while the others are still downloading instead of holding every page in memory until
+    the last one arrives. URLs that fail after all retries are skipped.
 
     Args:
-        task_result (dict): A dictionary containing the result of a task. Expected to have a key "content".
-        results (list[dict]): A list of dictionaries where successful task results are appended.
+        urls (list[str]): A list of URLs to fetch.
+        concurrent (int): The maximum number of concurrent requests.
+        max_retries (int, optional): The maximum number of retry attempts for each URL. Defaults to 3.
+        session (aiohttp.ClientSession | None, optional): The session to fetch the URLs with. If None,
+            a session is created for this call and closed afterwards. Defaults to None.
 
-    Returns:
-        None
+    Yields:
+        dict: The result of each successful fetch operation, in completion order.
     """
 
-    content = task_result.get("content")
-
-    if content is not None:
-        results.append(task_result)
-    else:
-        logger.warning(f"Skipping URL due to repeated failure: {task_result['url']}")
+    if session is None:
+        async with create_session(concurrent) as session:
+            async for result in fetch_all_urls(urls, concurrent, max_retries, session):
+                yield result
+        return
+
+    logger.info(f"Starting to fetch {len(urls)} URLs with concurrency {concurrent}")
+
+    # A single semaphore bounds the requests in flight, so a slow URL only ever
+    # occupies one slot instead of holding back a whole batch
+    semaphore = asyncio.Semaphore(concurrent)
+
+    async def bounded_fetch(url: str) -> dict:
+        async with semaphore:
+            return await fetch_url(session, url, max_retries=max_retries)
+
+    tasks = [asyncio.ensure_future(bounded_fetch(url)) for url in urls]
+    try:
+        for index, task in enumerate(asyncio.as_completed(tasks), 1):
+            try:
+                result = await task
+            except Exception as e:
+                logger.error(f"Task {index}/{len(urls)}: Encountered an exception: {e}")
+                continue
+
+            if result["content"] is None:
+                logger.warning(f"Skipping URL due to repeated failure: {result['url']}")
+                continue
+
+            yield result
+    finally:
+        # Stop the remaining fetches if the caller stops consuming early
+        for task in tasks:
+            task.cancel()
+
+    logger.info(f"Completed fetching {len(urls)} URLs.")
@@ -12,12 +12,12 @@ from url_snapshotter.commands.create_command import handle_create
 from url_snapshotter.commands.compare_command import handle_compare
 from url_snapshotter.commands.view_command import handle_view
 from url_snapshotter.commands.list_command import handle_list_snapshots
+from url_snapshotter.input_handler import prefetch_snapshots
 from url_snapshotter.logging_config import configure_structlog
-from rich.console import Console
+from url_snapshotter.output_formatter import console
 from rich.panel import Panel
 import logging
 
-console = Console()
 logger = logging.getLogger("url_snapshotter")
 
 
@@ -110,6 +110,9 @@ def display_main_menu():
 [bold yellow]Licensed under the MIT License[/bold yellow]"""
         console.print(Panel(banner, expand=False, style="bold blue"))
 
+        # Load the snapshot list while the user picks an option
+        prefetch_snapshots()
+
         console.print("🎯 [bold]Enter your choice:[/bold]")
         try:
             choice = inquirer.select(
@@ -158,7 +161,13 @@ def display_main_menu():
     show_default=True,
     help="Number of concurrent requests.",
 )
-def create(file, name, concurrent):
+@click.option(
+    "--resume",
+    "-r",
+    type=int,
+    help="ID of a partial snapshot to complete instead of creating a new one.",
+)
+def create(file, name, concurrent, resume):
     """
     Create a new snapshot of URLs.
 
@@ -166,12 +175,13 @@ def create(file, name, concurrent):
     file (str): The path to the file containing URLs to snapshot.
     name (str): The name for the snapshot.
     concurrent (int): The number of concurrent snapshot operations to perform.
+    resume (int): The ID of a partial snapshot to complete.
 
     Returns:
     None
     """
 
-    handle_create(file, name, concurrent)
+    handle_create(file, name, concurrent, resume)
 
 
 @cli.command()
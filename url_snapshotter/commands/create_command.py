@@ -4,19 +4,24 @@
 
 import time
 from yaspin import yaspin
-from url_snapshotter.snapshot_manager import SnapshotManager
-from url_snapshotter.db_utils import DatabaseManager
-from url_snapshotter.input_handler import prompt_for_file, prompt_for_snapshot_name
-from rich.console import Console
+from url_snapshotter.snapshot_manager import get_snapshot_manager
+from url_snapshotter.output_formatter import console
+from url_snapshotter.input_handler import (
+    load_urls_from_file,
+    prompt_for_file,
+    prompt_for_snapshot_name,
+)
 import structlog
 
-console = Console()
-db_manager = DatabaseManager()
-snapshot_manager = SnapshotManager(db_manager)
 logger = structlog.get_logger()
 
 
-def handle_create(file: str | None, name: str | None, concurrent: int):
+def handle_create(
+    file: str | None,
+    name: str | None,
+    concurrent: int,
+    resume_from: int | None = None,
+):
     """
     Handle the creation of a new snapshot.
 
@@ -24,6 +29,7 @@ def handle_create(file: str | None, name: str | None, concurrent: int):
     file (str | None): The path to the file containing URLs. If None, the user will be prompted to provide a file.
     name (str | None): The name of the snapshot. If None, the user will be prompted to provide a name.
     concurrent (int): The number of concurrent operations to perform during snapshot creation.
+    resume_from (int | None): The ID of a partial snapshot to complete instead of creating a new one.
 
     Returns:
     None
@@ -43,11 +49,13 @@ def handle_create(file: str | None, name: str | None, concurrent: int):
             if not urls:
                 return
 
-        name = name or prompt_for_snapshot_name()
+        # A resumed snapshot keeps its name
+        if resume_from is None:
+            name = name or prompt_for_snapshot_name()
         logger.debug(f"Snapshot name: {name}")
         logger.debug(f"Concurrent operations: {concurrent}")
-        logger.debug(f"URLs to snapshot: {urls}")
-        if not name:
+        logger.debug("URLs to snapshot", urls=urls)
+        if not name and resume_from is None:
             return
 
         # Update spinner message based on number of URLs
@@ -58,7 +66,9 @@ def handle_create(file: str | None, name: str | None, concurrent: int):
             start_time = time.time()
 
             # Call create_snapshot method
-            snapshot_manager.create_snapshot(urls, name, concurrent, 25)
+            get_snapshot_manager().create_snapshot(
+                urls, name, concurrent, resume_from=resume_from
+            )
 
             # Calculate elapsed time
             elapsed_time = time.time() - start_time
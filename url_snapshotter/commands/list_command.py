@@ -2,21 +2,16 @@
 
 # This module provides the functionality to list all available snapshots.
 
-from url_snapshotter.snapshot_manager import SnapshotManager
-from url_snapshotter.db_utils import DatabaseManager
-from url_snapshotter.output_formatter import display_snapshots_list
-from rich.console import Console
-
-console = Console()
-db_manager = DatabaseManager()
-snapshot_manager = SnapshotManager(db_manager)
+from url_snapshotter.input_handler import get_prefetched_snapshots
+from url_snapshotter.output_formatter import console, display_snapshots_list
 
 
 def handle_list_snapshots():
     """
     List all available snapshots.
 
-    This function retrieves all snapshots from the database using the db_manager,
+    This function retrieves all snapshots from the database (reusing the list prefetched
+    while the main menu was shown, if any),
     displays them using the display_snapshots_list function, and handles any
     exceptions that may occur during this process. After displaying the snapshots,
     it prompts the user to press Enter to return to the main menu.
@@ -26,7 +21,7 @@ def handle_list_snapshots():
     """
 
     try:
-        snapshots = db_manager.get_snapshots()
+        snapshots = get_prefetched_snapshots()
         display_snapshots_list(snapshots)
     except Exception as e:
         console.print(f"[bold red]🚨 An error occurred: {e}[/bold red]")
@@ -2,15 +2,9 @@
 
 # This module provides the functionality to view the details of a snapshot.
 
-from url_snapshotter.snapshot_manager import SnapshotManager
-from url_snapshotter.db_utils import DatabaseManager
+from url_snapshotter.snapshot_manager import get_snapshot_manager
 from url_snapshotter.input_handler import prompt_for_snapshot_id
-from url_snapshotter.output_formatter import display_snapshot_details
-from rich.console import Console
-
-console = Console()
-db_manager = DatabaseManager()
-snapshot_manager = SnapshotManager(db_manager)
+from url_snapshotter.output_formatter import console, display_snapshot_details
 
 
 def handle_view(snapshot_id: int | None = None):
@@ -30,7 +24,7 @@ def handle_view(snapshot_id: int | None = None):
             if snapshot_id is None:
                 return
 
-        snapshot_data = snapshot_manager.view_snapshot(snapshot_id)
+        snapshot_data = get_snapshot_manager().view_snapshot(snapshot_id)
         display_snapshot_details(snapshot_data)
     except Exception as e:
         console.print(f"[bold red]🚨 An error occurred: {e}[/bold red]")
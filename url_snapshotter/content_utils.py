@@ -3,25 +3,145 @@
 # This module provides the functionality to hash and clean content.
 
 import hashlib
-import re
+import zlib
 import structlog
-from url_snapshotter.patterns import get_patterns
+from url_snapshotter.patterns import COMBINED_PATTERN, strip_patterns
 
 logger = structlog.get_logger()
 
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
 
-def hash_content(content: str) -> str:
+# Hash constructors by the algorithm name that is stored with each snapshot
+HASH_FUNCTIONS = {"sha256": hashlib.sha256}
+if blake3 is not None:
+    HASH_FUNCTIONS["blake3"] = blake3
+
+# Algorithm for new snapshots. BLAKE3 is used when the optional package is installed,
+# otherwise SHA-256, which is hardware accelerated on most modern CPUs.
+HASH_ALGORITHM = "blake3" if blake3 is not None else "sha256"
+
+# Algorithm of snapshots that were stored before the algorithm was recorded
+LEGACY_HASH_ALGORITHM = "sha256"
+
+# zlib level for stored content; low levels compress HTML nearly as well at a fraction
+# of the cost of the default level
+_COMPRESSION_LEVEL = 3
+
+# Mixed into raw content hashes, so cleaning results cached under a raw hash are not
+# reused once the cleaning patterns change
+_CLEANING_SIGNATURE = COMBINED_PATTERN.pattern.encode("utf-8")
+
+# Size in bytes of the digest over all URLs of a snapshot
+_SNAPSHOT_DIGEST_SIZE = 16
+
+
+def compress_content(content: bytes) -> bytes:
     """
-    Create an SHA-256 hash of the given content.
+    Compress content for storage.
 
     Args:
-        content (str): The content to be hashed.
+        content (bytes): The content to compress.
 
     Returns:
-        str: The SHA-256 hash of the content as a hexadecimal string.
+        bytes: The zlib-compressed content, or empty bytes for empty content.
+    """
+
+    return zlib.compress(content, _COMPRESSION_LEVEL) if content else b""
+
+
+def decompress_content(content: bytes) -> bytes:
+    """
+    Decompress content created by compress_content().
+
+    Args:
+        content (bytes): The compressed content.
+
+    Returns:
+        bytes: The original content.
+
+    Raises:
+        zlib.error: If the content is not valid compressed data.
+    """
+
+    return zlib.decompress(content) if content else b""
+
+
+def hash_content(content: str | bytes, algorithm: str = HASH_ALGORITHM) -> bytes:
+    """
+    Create a hash of the given content.
+
+    Args:
+        content (str | bytes): The content to be hashed; strings are hashed as UTF-8.
+        algorithm (str, optional): The name of the hash algorithm, one of HASH_FUNCTIONS.
+            Defaults to HASH_ALGORITHM.
+
+    Returns:
+        bytes: The raw digest of the content.
+
+    Raises:
+        KeyError: If the algorithm is not available.
     """
 
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return HASH_FUNCTIONS[algorithm](content).digest()
+
+
+def hash_raw_content(content: str | bytes, algorithm: str = HASH_ALGORITHM) -> bytes:
+    """
+    Create a hash of fetched content before cleaning, tied to the current cleaning patterns.
+
+    Two pages with the same raw hash produce the same cleaned content and content hash,
+    so the result of cleaning one can be reused for the other.
+
+    Args:
+        content (str | bytes): The raw content to be hashed; strings are hashed as UTF-8.
+        algorithm (str, optional): The name of the hash algorithm, one of HASH_FUNCTIONS.
+            Defaults to HASH_ALGORITHM.
+
+    Returns:
+        bytes: The raw digest of the content and the cleaning patterns.
+
+    Raises:
+        KeyError: If the algorithm is not available.
+    """
+
+    hasher = HASH_FUNCTIONS[algorithm](_CLEANING_SIGNATURE)
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    hasher.update(content)
+    return hasher.digest()
+
+
+def hash_snapshot(entries) -> bytes:
+    """
+    Compute a digest over the URLs, HTTP codes and content hashes of a snapshot.
+
+    The entries are hashed in sorted order, so two snapshots with the same URLs, codes
+    and content hashes have the same digest regardless of the order they were fetched in.
+
+    Args:
+        entries (Iterable): Records with 'url', 'http_code' and 'content_hash' attributes.
+
+    Returns:
+        bytes: The 16-byte BLAKE2b digest of the snapshot.
+    """
+
+    digest = hashlib.blake2b(digest_size=_SNAPSHOT_DIGEST_SIZE)
+    for url, http_code, content_hash in sorted(
+        (
+            entry.url,
+            -1 if entry.http_code is None else entry.http_code,
+            entry.content_hash,
+        )
+        for entry in entries
+    ):
+        digest.update(f"{url}\0{http_code}\0{len(content_hash)}\0".encode("utf-8"))
+        digest.update(content_hash)
+    return digest.digest()
 
 
 def clean_content(content: str, url: str) -> str:
@@ -36,38 +156,15 @@ def clean_content(content: str, url: str) -> str:
         str: The cleaned content with specified patterns removed.
 
     Raises:
-        Warning: Logs a warning if the pattern structure is invalid or if individual patterns/messages are invalid.
         Error: Logs an error if an unexpected exception occurs during content processing.
     """
 
-    patterns = get_patterns()
-
-    # Validate that patterns is a list of dictionaries
-    if not isinstance(patterns, list) or any(
-        not isinstance(item, dict) or "pattern" not in item or "message" not in item
-        for item in patterns
-    ):
-        logger.warning(
-            f"Invalid pattern structure detected for URL: {url}. Skipping content cleaning."
-        )
-        return content
-
     try:
-        # Loop through all patterns and apply substitutions
-        for item in patterns:
-            # Ensure 'pattern' is a compiled regex and 'message' is a string
-            if not isinstance(item["pattern"], re.Pattern) or not isinstance(
-                item["message"], str
-            ):
-                logger.warning(
-                    f"Invalid pattern or message for URL: {url}. Skipping this pattern."
-                )
-                continue
-
-            # Perform the substitution if pattern matches
-            if item["pattern"].search(content):
-                logger.info(f"{item['message']} URL: {url}")
-                content = item["pattern"].sub("", content)
+        # Remove all patterns in a single scan over the content
+        content, messages = strip_patterns(content)
+        for message in messages:
+            # Key-value arguments are only rendered if DEBUG logging is enabled
+            logger.debug(message, url=url)
 
     except Exception as e:
         # Handle any unexpected errors in content processing
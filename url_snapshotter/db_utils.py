@@ -4,24 +4,152 @@
 
 from sqlalchemy import (
     create_engine,
+    event,
+    Boolean,
     Column,
     Integer,
+    LargeBinary,
     String,
     Text,
     DateTime,
     ForeignKey,
+    Index,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    text,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import (
+    aliased,
+    declarative_base,
+    sessionmaker,
+    relationship,
+    scoped_session,
 )
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship, scoped_session
 import os
+from collections import namedtuple
+from collections.abc import Iterator
 from datetime import datetime
+from functools import lru_cache
+from itertools import starmap
 
 import structlog
 
+from url_snapshotter.content_utils import (
+    HASH_ALGORITHM,
+    LEGACY_HASH_ALGORITHM,
+    compress_content,
+    decompress_content,
+    hash_snapshot,
+)
+
 # Base class for declarative class definitions
 Base = declarative_base()
 
 logger = structlog.get_logger()
 
+# Maximum number of URLs bound into a single IN (...) clause
+_URL_QUERY_CHUNK_SIZE = 500
+
+# Number of rows fetched at a time when streaming a snapshot
+_STREAM_BATCH_SIZE = 1000
+
+# A URL of a snapshot as returned by DatabaseManager.get_snapshot_data(); full_content
+# is only set when it was requested
+SnapshotEntry = namedtuple(
+    "SnapshotEntry", "url http_code content_hash full_content", defaults=(None,)
+)
+
+# Version of the stored data layout, kept in SQLite's user_version pragma. Version 1
+# stores content and raw hashes as raw digests instead of hexadecimal strings, version 2
+# replaces the (snapshot_id, url) index with a covering one, version 3 stores the full
+# content as UTF-8 encoded bytes instead of text, version 4 compresses it, version 5
+# stores a digest of each snapshot, version 6 keeps a single row per URL of a snapshot.
+_SCHEMA_VERSION = 6
+
+
+def _url_snapshot_rows(
+    snapshot_id: int, urls: list, created_at: datetime
+) -> list[dict]:
+    """
+    Build the url_snapshots rows of URL records for an executemany() insert.
+
+    Args:
+        snapshot_id (int): The ID of the snapshot the URLs belong to.
+        urls (list): URL records with the attributes described in DatabaseManager.save_snapshot().
+        created_at (datetime): The creation time of the rows.
+
+    Returns:
+        list[dict]: The column values of each row.
+    """
+
+    return [
+        {
+            "snapshot_id": snapshot_id,
+            "url": url_entry.url,
+            "http_code": url_entry.http_code,
+            "content_hash": url_entry.content_hash,
+            "full_content": url_entry.full_content,
+            "raw_hash": url_entry.raw_hash,
+            "created_at": created_at,
+        }
+        for url_entry in urls
+    ]
+
+
+def _hex_to_digest(value: str | bytes | None) -> bytes | None:
+    """
+    Convert a hash stored as a hexadecimal string to its raw digest.
+
+    Args:
+        value (str | bytes | None): The stored hash.
+
+    Returns:
+        bytes | None: The raw digest, or the value unchanged if it is not a string.
+    """
+
+    return bytes.fromhex(value) if isinstance(value, str) else value
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Configure a new SQLite connection for fewer disk syncs.
+
+    In WAL mode a commit appends to the write-ahead log instead of rewriting the database
+    file, and with synchronous=NORMAL the log is only synced at checkpoints. A crash can
+    lose the last transactions, but never corrupts the database.
+
+    Args:
+        dbapi_connection (sqlite3.Connection): The new DBAPI connection.
+        connection_record (_ConnectionRecord): The pool record of the connection.
+    """
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def _decode(content: bytes | None) -> str | None:
+    """
+    Decode stored full content, which is kept as compressed UTF-8 encoded bytes.
+
+    Args:
+        content (bytes | None): The stored content.
+
+    Returns:
+        str | None: The decoded content, or None if there is no content.
+    """
+
+    if content is None:
+        return None
+    return decompress_content(content).decode("utf-8", "replace")
+
 
 class Snapshot(Base):
     """
@@ -31,6 +159,12 @@ class Snapshot(Base):
         snapshot_id (int): The primary key for the snapshot.
         name (str): The name of the snapshot. Cannot be null.
         created_at (datetime): The timestamp when the snapshot was created. Defaults to the current UTC time.
+        hash_algorithm (str): The algorithm the content hashes of this snapshot were created with.
+            Defaults to the legacy algorithm for snapshots stored before it was recorded.
+        digest (bytes | None): The digest over the URLs, HTTP codes and content hashes of
+            this snapshot, as returned by content_utils.hash_snapshot().
+        partial (bool): Whether the snapshot is still being created, or its creation failed
+            before all URLs were stored. A partial snapshot can be resumed.
         url_snapshots (relationship): A relationship to the URLSnapshot model.
             - back_populates: "snapshot" - Indicates the attribute on the URLSnapshot model that relates back to this model.
             - cascade: "all, delete-orphan" - Specifies the cascade behavior for related URLSnapshot objects.
@@ -42,6 +176,11 @@ class Snapshot(Base):
     snapshot_id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    hash_algorithm = Column(
+        String, nullable=False, server_default=LEGACY_HASH_ALGORITHM
+    )
+    digest = Column(LargeBinary)
+    partial = Column(Boolean, nullable=False, server_default="0")
     url_snapshots = relationship(
         "URLSnapshot",
         back_populates="snapshot",
@@ -59,13 +198,30 @@ class URLSnapshot(Base):
         snapshot_id (int): Foreign key referencing the snapshot this URL belongs to.
         url (str): The URL being snapshotted.
         http_code (int): The HTTP status code returned when the URL was accessed.
-        content_hash (str): A hash of the content at the URL.
-        full_content (str): The full content retrieved from the URL.
+        content_hash (bytes): The raw digest of the content at the URL.
+        full_content (bytes): The cleaned content retrieved from the URL, UTF-8 encoded and
+            compressed with content_utils.compress_content().
+        raw_hash (bytes): The raw digest of the content before cleaning, used to reuse the cleaned
+            content when a later snapshot fetches the same raw content.
         created_at (datetime): The timestamp when the snapshot was created.
         snapshot (Snapshot): Relationship to the Snapshot model, back_populated by "url_snapshots".
     """
 
     __tablename__ = "url_snapshots"
+    __table_args__ = (
+        # Covers the comparison columns, so diffs and streamed snapshots are read from
+        # the index alone, in URL order
+        Index(
+            "ix_url_snapshots_snapshot_id_url_fingerprint",
+            "snapshot_id",
+            "url",
+            "http_code",
+            "content_hash",
+        ),
+        Index(
+            "ix_url_snapshots_snapshot_id_content_hash", "snapshot_id", "content_hash"
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     snapshot_id = Column(
@@ -73,8 +229,9 @@ class URLSnapshot(Base):
     )
     url = Column(Text, nullable=False)
     http_code = Column(Integer)
-    content_hash = Column(String, nullable=False)
-    full_content = Column(Text)
+    content_hash = Column(LargeBinary, nullable=False)
+    full_content = Column(LargeBinary)
+    raw_hash = Column(LargeBinary)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     snapshot = relationship("Snapshot", back_populates="url_snapshots")
 
@@ -103,17 +260,53 @@ class DatabaseManager:
         _initialize_db():
             Initializes the database tables.
 
+        _upgrade_schema():
+            Adds columns and indexes that are missing from tables created by an older version.
+
+        _convert_hex_hashes(connection):
+            Converts hashes stored as hexadecimal strings to raw digests.
+
         get_session():
             Provides a session for database operations.
 
-        save_snapshot(name: str, urls: list[dict[str, any]]):
-            Saves snapshot details into the database.
+        save_snapshot(name: str, urls: list, hash_algorithm: str = HASH_ALGORITHM) -> int:
+            Saves a complete snapshot into the database at once.
+
+        start_snapshot(name: str, hash_algorithm: str = HASH_ALGORITHM) -> int:
+            Creates a partial snapshot that URLs are added to in batches.
+
+        add_url_snapshots(snapshot_id: int, urls: list):
+            Adds a batch of URLs to a partial snapshot.
+
+        complete_snapshot(snapshot_id: int):
+            Marks a partial snapshot as complete.
+
+        get_snapshot(snapshot_id: int) -> Snapshot | None:
+            Retrieves a single snapshot.
+
+        get_stored_urls(snapshot_id: int) -> set[str]:
+            Retrieves the URLs stored for a specific snapshot ID.
 
         get_snapshots() -> list[Snapshot]:
             Retrieves all snapshots from the database.
 
-        get_snapshot_data(snapshot_id: int) -> list[dict[str, any]]:
-            Retrieves snapshot data for a specific snapshot ID.
+        get_snapshot_data(snapshot_id: int, *, offset: int = 0, limit: int | None = None, with_content: bool = False) -> list[SnapshotEntry]:
+            Retrieves a page of snapshot data for a specific snapshot ID.
+
+        iter_snapshot_rows(snapshot_id: int, with_content: bool = False) -> Iterator[tuple]:
+            Streams the URLs of a specific snapshot ID in URL order.
+
+        get_full_content(snapshot_id: int, urls: list[str] | None = None, decode: bool = True) -> dict[str, str | bytes]:
+            Retrieves the full content of URLs in a specific snapshot ID.
+
+        get_hash_algorithm(snapshot_id: int) -> str | None:
+            Retrieves the hash algorithm of a specific snapshot ID.
+
+        get_latest_raw_hashes(hash_algorithm: str = HASH_ALGORITHM) -> dict[str, tuple[bytes, bytes, int]]:
+            Retrieves the most recent raw content hash stored for each URL.
+
+        diff_snapshots(snapshot1_id: int, snapshot2_id: int) -> list[dict[str, any]]:
+            Retrieves the URLs whose HTTP code or content hash differ between two snapshots.
     """
 
     def __init__(self, timeout: int = 30):
@@ -138,6 +331,8 @@ class DatabaseManager:
         self.engine = create_engine(
             self.db_url, connect_args={"timeout": timeout}, future=True
         )
+        if not self.use_in_memory_db:
+            event.listen(self.engine, "connect", _set_sqlite_pragmas)
         self.Session = scoped_session(
             sessionmaker(bind=self.engine, expire_on_commit=False)
         )
@@ -185,6 +380,201 @@ class DatabaseManager:
 
         logger.debug("Initializing database tables.")
         Base.metadata.create_all(self.engine)
+        self._upgrade_schema()
+
+    def _upgrade_schema(self):
+        """
+        Add columns and indexes that are missing from tables created by an older version.
+
+        create_all() only creates missing tables, so columns added to a model later are
+        added here with ALTER TABLE. New columns must be nullable or have a server default.
+        Data stored in an older layout is converted once, tracked by SQLite's user_version.
+        """
+
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing_columns = {
+                    column["name"] for column in inspector.get_columns(table.name)
+                }
+                for column in table.columns:
+                    if column.name in existing_columns:
+                        continue
+
+                    column_type = column.type.compile(dialect=self.engine.dialect)
+                    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    if column.server_default is not None:
+                        ddl += f" DEFAULT '{column.server_default.arg}'"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+
+                    logger.info(f"Adding column {column.name} to table {table.name}.")
+                    connection.execute(text(ddl))
+
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+
+            version = connection.execute(text("PRAGMA user_version")).scalar()
+            if version < 1:
+                self._convert_hex_hashes(connection)
+            if version < 2:
+                connection.execute(
+                    text("DROP INDEX IF EXISTS ix_url_snapshots_snapshot_id_url")
+                )
+            if version < 3:
+                # Casting text to a blob keeps its UTF-8 encoded bytes
+                connection.execute(
+                    text(
+                        "UPDATE url_snapshots SET full_content = CAST(full_content AS BLOB) "
+                        "WHERE typeof(full_content) = 'text'"
+                    )
+                )
+            if version < 4:
+                self._compress_stored_content(connection)
+            if version < 6:
+                # Digests are computed over the de-duplicated URLs
+                self._remove_duplicate_urls(connection)
+                self._compute_snapshot_digests(connection)
+            if version < _SCHEMA_VERSION:
+                connection.execute(text(f"PRAGMA user_version = {_SCHEMA_VERSION}"))
+
+    def _compress_stored_content(self, connection):
+        """
+        Compress the full content stored before it was kept compressed.
+
+        Rows are converted in batches in ID order, so the content is never loaded all at
+        once.
+
+        Args:
+            connection (Connection): The connection of the running upgrade transaction.
+        """
+
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                text(
+                    "SELECT id, full_content FROM url_snapshots "
+                    "WHERE id > :last_id AND full_content IS NOT NULL "
+                    "ORDER BY id LIMIT :batch_size"
+                ),
+                {"last_id": last_id, "batch_size": _STREAM_BATCH_SIZE},
+            ).all()
+            if not rows:
+                return
+
+            logger.info(f"Compressing the stored content of {len(rows)} URLs.")
+            connection.execute(
+                text("UPDATE url_snapshots SET full_content = :content WHERE id = :id"),
+                [
+                    {"id": row_id, "content": compress_content(content)}
+                    for row_id, content in rows
+                ],
+            )
+            last_id = rows[-1][0]
+
+    def _remove_duplicate_urls(self, connection):
+        """
+        Remove all but the last stored row of URLs listed more than once in a snapshot.
+
+        Snapshots were stored without de-duplicating their URLs, and comparisons join the
+        URLs of two snapshots, so a duplicate would be reported once per combination of
+        rows. Like the URL-keyed comparison of that time, the last row is kept. Digests of
+        the affected snapshots are cleared, so they are computed again.
+
+        Args:
+            connection (Connection): The connection of the running upgrade transaction.
+        """
+
+        snapshot_ids = (
+            connection.execute(
+                text(
+                    "SELECT DISTINCT snapshot_id FROM url_snapshots "
+                    "GROUP BY snapshot_id, url HAVING COUNT(*) > 1"
+                )
+            )
+            .scalars()
+            .all()
+        )
+        if not snapshot_ids:
+            return
+
+        logger.info(f"Removing duplicate URLs from {len(snapshot_ids)} snapshots.")
+        connection.execute(
+            text(
+                "DELETE FROM url_snapshots WHERE id NOT IN "
+                "(SELECT MAX(id) FROM url_snapshots GROUP BY snapshot_id, url)"
+            )
+        )
+        connection.execute(
+            text("UPDATE snapshots SET digest = NULL WHERE snapshot_id = :snapshot_id"),
+            [{"snapshot_id": snapshot_id} for snapshot_id in snapshot_ids],
+        )
+
+    def _compute_snapshot_digests(self, connection):
+        """
+        Compute the digest of complete snapshots that have none recorded.
+
+        Args:
+            connection (Connection): The connection of the running upgrade transaction.
+        """
+
+        snapshot_ids = connection.execute(
+            text(
+                "SELECT snapshot_id FROM snapshots WHERE digest IS NULL AND NOT partial"
+            )
+        ).scalars()
+        for snapshot_id in snapshot_ids.all():
+            rows = connection.execute(
+                text(
+                    "SELECT url, http_code, content_hash FROM url_snapshots "
+                    "WHERE snapshot_id = :snapshot_id"
+                ),
+                {"snapshot_id": snapshot_id},
+            )
+            logger.info(f"Computing the digest of snapshot {snapshot_id}.")
+            connection.execute(
+                text(
+                    "UPDATE snapshots SET digest = :digest "
+                    "WHERE snapshot_id = :snapshot_id"
+                ),
+                {"snapshot_id": snapshot_id, "digest": hash_snapshot(rows)},
+            )
+
+    def _convert_hex_hashes(self, connection):
+        """
+        Convert content and raw hashes stored as hexadecimal strings to raw digests.
+
+        Both representations must not be mixed, since the database compares the hashes
+        of two snapshots byte by byte.
+
+        Args:
+            connection (Connection): The connection of the running upgrade transaction.
+        """
+
+        rows = connection.execute(
+            text(
+                "SELECT id, content_hash, raw_hash FROM url_snapshots "
+                "WHERE typeof(content_hash) = 'text' OR typeof(raw_hash) = 'text'"
+            )
+        ).all()
+        if not rows:
+            return
+
+        logger.info(f"Converting {len(rows)} stored hashes to raw digests.")
+        connection.execute(
+            text(
+                "UPDATE url_snapshots SET content_hash = :content_hash, "
+                "raw_hash = :raw_hash WHERE id = :id"
+            ),
+            [
+                {
+                    "id": row_id,
+                    "content_hash": _hex_to_digest(content_hash),
+                    "raw_hash": _hex_to_digest(raw_hash),
+                }
+                for row_id, content_hash, raw_hash in rows
+            ],
+        )
 
     def get_session(self):
         """
@@ -197,59 +587,200 @@ class DatabaseManager:
         logger.debug("Creating new database session.")
         return self.Session()
 
-    def save_snapshot(self, name: str, urls: list[dict[str, any]]):
+    def save_snapshot(
+        self,
+        name: str,
+        urls: list,
+        hash_algorithm: str = HASH_ALGORITHM,
+    ) -> int:
         """
         Saves a snapshot of URLs to the database.
 
+        The snapshot is written with start_snapshot(), add_url_snapshots() and
+        complete_snapshot(), like snapshots that are stored as they are fetched. If adding
+        the URLs fails, the snapshot is left partial.
+
         Args:
             name (str): The name of the snapshot.
-            urls (list[dict[str, any]]): A list of dictionaries containing URL data. Each dictionary should have the keys:
-                - "url" (str): The URL to be saved.
-                - "http_code" (optional, int): The HTTP status code of the URL.
-                - "content_hash" (str): The hash of the URL content.
-                - "full_content" (optional, str): The full content of the URL.
+            urls (list): A list of URL records, such as snapshot_manager.URLSnapshot. Each record should have the attributes:
+                - url (str): The URL to be saved.
+                - http_code (int | None): The HTTP status code of the URL.
+                - content_hash (bytes): The hash of the URL content.
+                - full_content (bytes): The cleaned content of the URL, as returned by
+                  content_utils.compress_content().
+                - raw_hash (bytes | None): The hash of the content before cleaning.
+            hash_algorithm (str, optional): The algorithm the content hashes were created with.
+                Defaults to HASH_ALGORITHM.
+
+        Returns:
+            int: The ID of the new snapshot.
 
         Raises:
             Exception: If there is an error during the database operation.
         """
 
         logger.debug(f"Saving snapshot '{name}' with {len(urls)} URLs.")
+        snapshot_id = self.start_snapshot(name, hash_algorithm)
+        if urls:
+            self.add_url_snapshots(snapshot_id, urls)
+        self.complete_snapshot(snapshot_id)
+        logger.debug(f"Snapshot '{name}' saved successfully.")
+        return snapshot_id
+
+    def start_snapshot(self, name: str, hash_algorithm: str = HASH_ALGORITHM) -> int:
+        """
+        Create a partial snapshot without URLs.
+
+        URLs are added with add_url_snapshots() as they are processed, so they survive a
+        failure later on. The snapshot stays partial until complete_snapshot() is called.
+
+        Args:
+            name (str): The name of the snapshot.
+            hash_algorithm (str, optional): The algorithm the content hashes are created with.
+                Defaults to HASH_ALGORITHM.
+
+        Returns:
+            int: The ID of the new snapshot.
+
+        Raises:
+            Exception: If there is an error during the database operation.
+        """
+
+        logger.debug(f"Starting snapshot '{name}'.")
         session = self.get_session()
         try:
-            snapshot = Snapshot(name=name.strip(), created_at=datetime.utcnow())
+            snapshot = Snapshot(
+                name=name.strip(),
+                created_at=datetime.utcnow(),
+                hash_algorithm=hash_algorithm,
+                partial=True,
+            )
             session.add(snapshot)
-            session.flush()  # Flush to assign snapshot_id without committing
+            session.commit()
             logger.debug(
                 f"Assigned snapshot_id: {snapshot.snapshot_id} to snapshot '{name}'"
             )
+            return snapshot.snapshot_id
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to start snapshot '{name}': {e}")
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
 
-            # Add URL snapshots
-            for url_entry in urls:
-                try:
-                    url = url_entry["url"]
-                    http_code = url_entry.get("http_code")
-                    content_hash = url_entry["content_hash"]
-                    full_content = url_entry.get("full_content", "")
-                except KeyError as ke:
-                    logger.error(f"Missing key {ke} in url_entry: {url_entry}")
-                    continue
-
-                url_snapshot = URLSnapshot(
-                    snapshot_id=snapshot.snapshot_id,
-                    url=url,
-                    http_code=http_code,
-                    content_hash=content_hash,
-                    full_content=full_content,
-                    created_at=datetime.utcnow(),
-                )
-                session.add(url_snapshot)
-                logger.debug(f"Added URLSnapshot for URL: {url}")
+    def add_url_snapshots(self, snapshot_id: int, urls: list):
+        """
+        Add a batch of URLs to a partial snapshot with a single executemany().
+
+        Args:
+            snapshot_id (int): The ID of the snapshot, as returned by start_snapshot().
+            urls (list): URL records with the attributes described in save_snapshot().
+
+        Raises:
+            Exception: If there is an error during the database operation.
+        """
 
+        logger.debug(f"Adding {len(urls)} URLs to snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            session.execute(
+                insert(URLSnapshot),
+                _url_snapshot_rows(snapshot_id, urls, datetime.utcnow()),
+            )
             session.commit()
-            logger.debug(f"Snapshot '{name}' saved successfully.")
         except Exception as e:
             session.rollback()
-            logger.error(f"Failed to save snapshot '{name}': {e}")
+            logger.error(f"Failed to add URLs to snapshot_id {snapshot_id}: {e}")
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def complete_snapshot(self, snapshot_id: int):
+        """
+        Mark a partial snapshot as complete and record its digest.
+
+        The digest is computed from the stored URLs, so it also covers URLs stored by an
+        earlier, failed attempt.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Raises:
+            Exception: If there is an error during the database operation.
+        """
+
+        logger.debug(f"Completing snapshot_id: {snapshot_id}")
+        try:
+            with self.engine.begin() as connection:
+                rows = connection.execute(
+                    select(
+                        URLSnapshot.url, URLSnapshot.http_code, URLSnapshot.content_hash
+                    ).where(URLSnapshot.snapshot_id == snapshot_id)
+                )
+                connection.execute(
+                    update(Snapshot)
+                    .where(Snapshot.snapshot_id == snapshot_id)
+                    .values(digest=hash_snapshot(rows), partial=False)
+                )
+        except Exception as e:
+            logger.error(f"Failed to complete snapshot_id {snapshot_id}: {e}")
+            raise
+
+    def get_snapshot(self, snapshot_id: int) -> Snapshot | None:
+        """
+        Retrieve a single snapshot.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Returns:
+            Snapshot | None: The snapshot, or None if it does not exist.
+
+        Raises:
+            Exception: If an error occurs while fetching the snapshot.
+        """
+
+        logger.debug(f"Retrieving snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            return session.get(Snapshot, snapshot_id)
+        except Exception as e:
+            logger.error(f"Failed to fetch snapshot_id {snapshot_id}: {e}")
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def get_stored_urls(self, snapshot_id: int) -> set[str]:
+        """
+        Retrieve the URLs that are stored for a snapshot.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Returns:
+            set[str]: The stored URLs.
+
+        Raises:
+            Exception: If an error occurs while fetching the URLs.
+        """
+
+        logger.debug(f"Retrieving stored URLs for snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            return set(
+                session.scalars(
+                    select(URLSnapshot.url).where(
+                        URLSnapshot.snapshot_id == snapshot_id
+                    )
+                )
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to fetch stored URLs for snapshot_id {snapshot_id}: {e}"
+            )
             raise
         finally:
             session.close()
@@ -282,42 +813,63 @@ class DatabaseManager:
             session.close()
             logger.debug("Database session closed.")
 
-    def get_snapshot_data(self, snapshot_id: int) -> list[dict[str, any]]:
+    def get_snapshot_data(
+        self,
+        snapshot_id: int,
+        *,
+        offset: int = 0,
+        limit: int | None = None,
+        with_content: bool = False,
+    ) -> list[SnapshotEntry]:
         """
         Retrieve snapshot data for a given snapshot ID.
 
+        By default only the columns needed to compare snapshots are loaded. Use
+        with_content or get_full_content() to load the content of URLs as well.
+
         Args:
             snapshot_id (int): The ID of the snapshot to retrieve data for.
+            offset (int, optional): The number of URL snapshots to skip. Defaults to 0.
+            limit (int | None, optional): The maximum number of URL snapshots to retrieve,
+                or None to retrieve all of them. Defaults to None.
+            with_content (bool, optional): Whether to include the full content. Defaults to False.
 
         Returns:
-            list[dict[str, any]]: A list of dictionaries containing snapshot data. Each dictionary includes:
+            list[SnapshotEntry]: The URLs of the snapshot, in the order they were saved. Each
+            entry is a named tuple with the fields:
             - url (str): The URL of the snapshot.
             - http_code (int): The HTTP status code of the snapshot.
-            - content_hash (str): The hash of the snapshot content.
-            - full_content (str): The full content of the snapshot.
+            - content_hash (bytes): The hash of the snapshot content.
+            - full_content (str | None): The full content of the URL, or None unless
+              with_content is True.
 
         Raises:
             Exception: If an error occurs while fetching the snapshot data.
         """
 
-        logger.debug(f"Retrieving data for snapshot_id: {snapshot_id}")
+        logger.debug(
+            f"Retrieving data for snapshot_id: {snapshot_id} (offset: {offset}, limit: {limit}, with_content: {with_content})"
+        )
         session = self.get_session()
         try:
-            snapshot = (
-                session.query(Snapshot).filter_by(snapshot_id=snapshot_id).one_or_none()
+            columns = [URLSnapshot.url, URLSnapshot.http_code, URLSnapshot.content_hash]
+            if with_content:
+                columns.append(URLSnapshot.full_content)
+
+            rows = (
+                session.query(*columns)
+                .filter_by(snapshot_id=snapshot_id)
+                .order_by(URLSnapshot.id)
+                .offset(offset)
+                .limit(limit)
             )
-            if not snapshot:
-                logger.debug(f"No snapshot found with snapshot_id: {snapshot_id}")
-                return []
-            snapshot_data = [
-                {
-                    "url": url_snapshot.url,
-                    "http_code": url_snapshot.http_code,
-                    "content_hash": url_snapshot.content_hash,
-                    "full_content": url_snapshot.full_content,
-                }
-                for url_snapshot in snapshot.url_snapshots
-            ]
+            if with_content:
+                snapshot_data = [
+                    SnapshotEntry(url, http_code, content_hash, _decode(content))
+                    for url, http_code, content_hash, content in rows
+                ]
+            else:
+                snapshot_data = list(starmap(SnapshotEntry, rows))
             logger.debug(
                 f"Retrieved data for snapshot_id: {snapshot_id} with {len(snapshot_data)} URL snapshots."
             )
@@ -330,3 +882,335 @@ class DatabaseManager:
         finally:
             session.close()
             logger.debug("Database session closed.")
+
+    def iter_snapshot_rows(
+        self, snapshot_id: int, with_content: bool = False, decompress: bool = True
+    ) -> Iterator[tuple]:
+        """
+        Stream the URLs of a snapshot in URL order, without loading them all at once.
+
+        Rows are read in batches of _STREAM_BATCH_SIZE on a connection of their own, so
+        two snapshots can be streamed side by side and merged. The (snapshot_id, url) index
+        provides the order, so no sort is needed.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot to stream.
+            with_content (bool, optional): Whether to include the full content. Defaults to False.
+            decompress (bool, optional): Whether to decompress the full content, or return
+                it as stored. Defaults to True.
+
+        Yields:
+            tuple: The (url, http_code, content_hash) of each URL, followed by the full
+            content as UTF-8 encoded bytes if with_content is True.
+
+        Raises:
+            Exception: If an error occurs while reading the rows.
+        """
+
+        logger.debug(f"Streaming rows of snapshot_id: {snapshot_id}")
+        columns = [URLSnapshot.url, URLSnapshot.http_code, URLSnapshot.content_hash]
+        if with_content:
+            columns.append(URLSnapshot.full_content)
+        query = (
+            select(*columns)
+            .where(URLSnapshot.snapshot_id == snapshot_id)
+            .order_by(URLSnapshot.url)
+            .execution_options(yield_per=_STREAM_BATCH_SIZE)
+        )
+
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(query)
+                if not (with_content and decompress):
+                    yield from rows
+                    return
+
+                for url, http_code, content_hash, content in rows:
+                    if content is not None:
+                        content = decompress_content(content)
+                    yield url, http_code, content_hash, content
+        except Exception as e:
+            logger.error(f"Failed to stream rows of snapshot_id {snapshot_id}: {e}")
+            raise
+
+    def get_full_content(
+        self, snapshot_id: int, urls: list[str] | None = None, decode: bool = True
+    ) -> dict[str, str | bytes]:
+        """
+        Retrieve the full content of URLs in a snapshot.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot to retrieve content for.
+            urls (list[str] | None, optional): The URLs to retrieve content for. If None, the
+                content of every URL in the snapshot is retrieved. Defaults to None.
+            decode (bool, optional): Whether to decompress and decode the content to strings,
+                instead of returning the stored bytes. Defaults to True.
+
+        Returns:
+            dict[str, str | bytes]: The full content of each URL found, keyed by URL.
+
+        Raises:
+            Exception: If an error occurs while fetching the content.
+        """
+
+        logger.debug(f"Retrieving full content for snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            query = session.query(URLSnapshot.url, URLSnapshot.full_content).filter_by(
+                snapshot_id=snapshot_id
+            )
+            if urls is None:
+                contents = dict(query.all())
+            else:
+                # Query in chunks to stay below SQLite's limit on bound parameters
+                contents = {}
+                for i in range(0, len(urls), _URL_QUERY_CHUNK_SIZE):
+                    chunk = urls[i : i + _URL_QUERY_CHUNK_SIZE]
+                    contents.update(query.filter(URLSnapshot.url.in_(chunk)).all())
+
+            if decode:
+                return {url: _decode(content) for url, content in contents.items()}
+            return contents
+        except Exception as e:
+            logger.error(
+                f"Failed to fetch full content for snapshot_id {snapshot_id}: {e}"
+            )
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def get_snapshot_digest(self, snapshot_id: int) -> bytes | None:
+        """
+        Retrieve the digest over the URLs, HTTP codes and content hashes of a snapshot.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Returns:
+            bytes | None: The digest, or None if the snapshot does not exist.
+
+        Raises:
+            Exception: If an error occurs while fetching the digest.
+        """
+
+        logger.debug(f"Retrieving digest for snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            return (
+                session.query(Snapshot.digest)
+                .filter_by(snapshot_id=snapshot_id)
+                .scalar()
+            )
+        except Exception as e:
+            logger.error(f"Failed to fetch digest for snapshot_id {snapshot_id}: {e}")
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def get_hash_algorithm(self, snapshot_id: int) -> str | None:
+        """
+        Retrieve the algorithm the content hashes of a snapshot were created with.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Returns:
+            str | None: The name of the hash algorithm, or None if the snapshot does not exist.
+
+        Raises:
+            Exception: If an error occurs while fetching the hash algorithm.
+        """
+
+        logger.debug(f"Retrieving hash algorithm for snapshot_id: {snapshot_id}")
+        session = self.get_session()
+        try:
+            return (
+                session.query(Snapshot.hash_algorithm)
+                .filter_by(snapshot_id=snapshot_id)
+                .scalar()
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to fetch hash algorithm for snapshot_id {snapshot_id}: {e}"
+            )
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def get_latest_raw_hashes(
+        self, hash_algorithm: str = HASH_ALGORITHM
+    ) -> dict[str, tuple[bytes, bytes, int]]:
+        """
+        Retrieve the most recent raw content hash stored for each URL.
+
+        Only snapshots hashed with the given algorithm are considered, so the returned
+        content hashes can be reused in a snapshot using that algorithm.
+
+        Args:
+            hash_algorithm (str, optional): The hash algorithm of the snapshots to consider.
+                Defaults to HASH_ALGORITHM.
+
+        Returns:
+            dict[str, tuple[bytes, bytes, int]]: The raw hash, content hash and snapshot ID of the
+            most recent row of each URL, keyed by URL.
+
+        Raises:
+            Exception: If an error occurs while fetching the raw hashes.
+        """
+
+        logger.debug(f"Retrieving latest raw hashes for algorithm: {hash_algorithm}")
+        session = self.get_session()
+        try:
+            latest_ids = (
+                session.query(func.max(URLSnapshot.id))
+                .join(Snapshot)
+                .filter(
+                    URLSnapshot.raw_hash.is_not(None),
+                    Snapshot.hash_algorithm == hash_algorithm,
+                )
+                .group_by(URLSnapshot.url)
+            )
+            rows = session.query(
+                URLSnapshot.url,
+                URLSnapshot.raw_hash,
+                URLSnapshot.content_hash,
+                URLSnapshot.snapshot_id,
+            ).filter(URLSnapshot.id.in_(latest_ids))
+            return {
+                url: (raw_hash, content_hash, snapshot_id)
+                for url, raw_hash, content_hash, snapshot_id in rows
+            }
+        except Exception as e:
+            logger.error(f"Failed to fetch latest raw hashes: {e}")
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+    def diff_snapshots(
+        self, snapshot1_id: int, snapshot2_id: int
+    ) -> list[dict[str, any]]:
+        """
+        Retrieve the URLs whose HTTP code or content hash differ between two snapshots.
+
+        The comparison runs in the database, so unchanged rows are never transferred.
+        SQLite has no FULL OUTER JOIN, so it is emulated with the union of a LEFT JOIN in
+        each direction. URLs are joined by value, which relies on each URL being stored
+        once per snapshot. The content hashes are only comparable if both snapshots were
+        created with the same hash algorithm.
+
+        Args:
+            snapshot1_id (int): The ID of the first snapshot.
+            snapshot2_id (int): The ID of the second snapshot.
+
+        Returns:
+            list[dict[str, any]]: A list of dictionaries, one per changed URL. Each dictionary includes:
+            - url (str): The URL.
+            - snapshot1_http_code (int | str): The HTTP code in the first snapshot, or "N/A".
+            - snapshot2_http_code (int | str): The HTTP code in the second snapshot, or "N/A".
+            - snapshot1_content_hash (bytes | str): The content hash in the first snapshot, or "N/A".
+            - snapshot2_content_hash (bytes | str): The content hash in the second snapshot, or "N/A".
+
+        Raises:
+            Exception: If an error occurs while comparing the snapshots.
+        """
+
+        logger.debug(f"Comparing snapshots {snapshot1_id} and {snapshot2_id} in SQL")
+        session = self.get_session()
+        try:
+            entry1 = aliased(URLSnapshot)
+            entry2 = aliased(URLSnapshot)
+
+            # URLs of the first snapshot that changed or are missing from the second
+            changed_or_removed = (
+                session.query(
+                    entry1.url,
+                    entry1.http_code,
+                    entry2.http_code,
+                    entry1.content_hash,
+                    entry2.content_hash,
+                    entry2.id.is_(None),
+                    literal(False),
+                )
+                .outerjoin(
+                    entry2,
+                    (entry2.snapshot_id == snapshot2_id) & (entry2.url == entry1.url),
+                )
+                .filter(
+                    entry1.snapshot_id == snapshot1_id,
+                    or_(
+                        entry2.id.is_(None),
+                        entry1.http_code.is_distinct_from(entry2.http_code),
+                        entry1.content_hash != entry2.content_hash,
+                    ),
+                )
+            )
+            # URLs that only exist in the second snapshot
+            added = (
+                session.query(
+                    entry2.url,
+                    entry1.http_code,
+                    entry2.http_code,
+                    entry1.content_hash,
+                    entry2.content_hash,
+                    literal(False),
+                    literal(True),
+                )
+                .outerjoin(
+                    entry1,
+                    (entry1.snapshot_id == snapshot1_id) & (entry1.url == entry2.url),
+                )
+                .filter(entry2.snapshot_id == snapshot2_id, entry1.id.is_(None))
+            )
+            rows = session.execute(
+                union_all(changed_or_removed.statement, added.statement)
+            )
+
+            differences = [
+                {
+                    "url": url,
+                    "snapshot1_http_code": "N/A" if added_url else http_code1,
+                    "snapshot2_http_code": "N/A" if removed_url else http_code2,
+                    "snapshot1_content_hash": "N/A" if added_url else content_hash1,
+                    "snapshot2_content_hash": "N/A" if removed_url else content_hash2,
+                }
+                for (
+                    url,
+                    http_code1,
+                    http_code2,
+                    content_hash1,
+                    content_hash2,
+                    removed_url,
+                    added_url,
+                ) in rows
+            ]
+            logger.debug(
+                f"Found {len(differences)} differences between snapshots {snapshot1_id} and {snapshot2_id}."
+            )
+            return differences
+        except Exception as e:
+            logger.error(
+                f"Failed to compare snapshots {snapshot1_id} and {snapshot2_id}: {e}"
+            )
+            raise
+        finally:
+            session.close()
+            logger.debug("Database session closed.")
+
+
+@lru_cache(maxsize=1)
+def get_database_manager() -> DatabaseManager:
+    """
+    Return the process-wide DatabaseManager, creating it on first use.
+
+    Deferring the creation keeps the database engine from being set up at import
+    time, so commands that never touch the database (or `--help`) start faster.
+
+    Returns:
+        DatabaseManager: The shared DatabaseManager instance.
+    """
+
+    return DatabaseManager()
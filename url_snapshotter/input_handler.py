@@ -4,27 +4,111 @@
 
 import structlog
 import validators
+from concurrent.futures import Future, ThreadPoolExecutor
 from time import sleep
 
 from InquirerPy import inquirer
-from rich.console import Console
 from rich.prompt import Prompt
+from rich.text import Text
 
-from url_snapshotter.db_utils import DatabaseManager
+from url_snapshotter.db_utils import get_database_manager
+from url_snapshotter.output_formatter import console
 
-console = Console()
-db_manager = DatabaseManager()
 logger = structlog.get_logger()
 
+# Prompts and messages are parsed from markup once at import time instead of on
+# every call
+_ASK_FILE = Text.from_markup(
+    "[bold yellow]📂 Enter the path to a file containing URLs (or type 'exit' to return to the main menu)[/bold yellow]"
+)
+_NO_FILE_PATH = Text.from_markup(
+    "[bold red]🚨 No file path provided. Please try again.[/bold red]"
+)
+_RETURNING_TO_MENU = Text.from_markup(
+    "[bold yellow]👋 Returning to the main menu...[/bold yellow]"
+)
+_PRESS_ENTER = Text.from_markup(
+    "[bold cyan]Press Enter to return to the main menu...[/bold cyan]"
+)
+_ASK_NAME = Text.from_markup(
+    "[bold yellow]📝 Enter a name for the snapshot (Can contain any character)[/bold yellow]"
+)
+_NO_SNAPSHOT_NAME = Text.from_markup(
+    "[bold red]🚨 No snapshot name provided.[/bold red]"
+)
+_NOT_ENOUGH_SNAPSHOTS = Text.from_markup(
+    "[bold red]🚨 Not enough snapshots available to compare.[/bold red]"
+)
+_COMPARE_INSTRUCTIONS = Text.from_markup(
+    "[bold cyan]🕹️ Use arrow keys and Space to select two snapshots to compare, "
+    "press Enter to confirm or Esc to return to the main menu. The older snapshot "
+    "is compared as snapshot 1.[/bold cyan]"
+)
+_NO_SNAPSHOTS = Text.from_markup("[bold red]🚨 No snapshots available.[/bold red]")
+_VIEW_INSTRUCTIONS = Text.from_markup(
+    "[bold cyan]🕹️ Use arrow keys to select a snapshot to view, and press Enter.[/bold cyan]"
+)
+
+# Menu entry that returns to the main menu from a snapshot selection
+_RETURN_TO_MENU_OPTION = "🔙 Return to Main Menu"
+
+# Background worker that loads the snapshot list while the user is still in the main menu
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="snapshot-list-prefetch"
+)
+_snapshots_future: Future | None = None
+
+
+def prefetch_snapshots():
+    """
+    Start loading the list of snapshots in a background thread.
+
+    The result is picked up by the next call to get_prefetched_snapshots(), which hides
+    the database latency behind the time the user spends in the main menu. Prefetching
+    is skipped for in-memory databases, as those are not shared between threads.
+    """
+
+    global _snapshots_future
+
+    db_manager = get_database_manager()
+    if db_manager.use_in_memory_db:
+        return
+
+    _snapshots_future = _prefetch_executor.submit(db_manager.get_snapshots)
+
+
+def get_prefetched_snapshots() -> list:
+    """
+    Return the list of snapshots, using the result of prefetch_snapshots() if available.
+
+    A prefetched result is used at most once, so a later call never returns a list that
+    predates snapshots created in the meantime. Without a prefetch, or if it failed, the
+    snapshots are loaded synchronously.
+
+    Returns:
+        list: The snapshots stored in the database.
+    """
+
+    global _snapshots_future
+
+    future, _snapshots_future = _snapshots_future, None
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Prefetching snapshots failed, loading them again: {e}")
+
+    return get_database_manager().get_snapshots()
+
 
 def load_urls_from_file(file_path: str) -> list[str]:
     """
     Load URLs from a specified file.
 
-    This function reads a file line by line, validates each line to ensure it is a valid URL
-    starting with "http://" or "https://", and returns a list of valid URLs. If the file is
-    empty or contains no valid URLs, or if the file does not exist, appropriate exceptions
-    are raised.
+    This function reads the whole file in binary mode, decodes it once and splits it into
+    lines, validates each non-empty line to ensure it is a valid URL starting with "http://"
+    or "https://", and returns a list of valid URLs. If the file is empty or contains no
+    valid URLs, or if the file does not exist, appropriate exceptions are raised.
 
     Args:
         file_path (str): The path to the file containing URLs.
@@ -40,20 +124,22 @@ def load_urls_from_file(file_path: str) -> list[str]:
 
     logger.debug(f"Attempting to load URLs from file: {file_path}")
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            urls = []
-            for line in f:
-                stripped_line = line.strip()
-                if stripped_line:
-                    # Check if the line is a valid URL and starts with http or https
-                    if validators.url(stripped_line) and (
-                        stripped_line.startswith("http://")
-                        or stripped_line.startswith("https://")
-                    ):
-                        urls.append(stripped_line)
-                    else:
-                        logger.error(f"Invalid URL detected: '{stripped_line}'")
-                        raise ValueError(f"Invalid URL detected: '{stripped_line}'")
+        # Read the file in one go and decode it once, instead of decoding and
+        # stripping line by line through the text-mode file iterator
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        urls = [
+            stripped_line
+            for line in data.decode("utf-8", "replace").splitlines()
+            if (stripped_line := line.strip())
+        ]
+
+        for url in urls:
+            # Check if the line is a valid URL and starts with http or https
+            if not (url.startswith(("http://", "https://")) and validators.url(url)):
+                logger.error(f"Invalid URL detected: '{url}'")
+                raise ValueError(f"Invalid URL detected: '{url}'")
 
         if not urls:
             logger.error(
@@ -84,19 +170,13 @@ def prompt_for_file() -> list[str] | None:
 
     while True:
         try:
-            file_path = Prompt.ask(
-                "[bold yellow]📂 Enter the path to a file containing URLs (or type 'exit' to return to the main menu)[/bold yellow]"
-            ).strip()
+            file_path = Prompt.ask(_ASK_FILE).strip()
 
             if not file_path:
-                console.print(
-                    "[bold red]🚨 No file path provided. Please try again.[/bold red]"
-                )
+                console.print(_NO_FILE_PATH)
                 logger.warning("No file path provided by the user.")
             elif file_path.lower() == "exit":
-                console.print(
-                    "[bold yellow]👋 Returning to the main menu...[/bold yellow]"
-                )
+                console.print(_RETURNING_TO_MENU)
                 logger.info("User chose to exit to the main menu from file prompt.")
                 return None
             else:
@@ -112,10 +192,7 @@ def prompt_for_file() -> list[str] | None:
         except Exception as e:
             console.print(f"[bold red]🚨 An unexpected error occurred: {e}[/bold red]")
             logger.exception(f"An unexpected error occurred: {e}")
-            console.input(
-                "[bold cyan]Press Enter to return to the main menu...[/bold cyan]",
-                markup=True,
-            )
+            console.input(_PRESS_ENTER)
             return None
 
 
@@ -129,11 +206,9 @@ def prompt_for_snapshot_name() -> str | None:
     """
 
     try:
-        name = Prompt.ask(
-            "[bold yellow]📝 Enter a name for the snapshot (Can contain any character)[/bold yellow]"
-        ).strip()
+        name = Prompt.ask(_ASK_NAME).strip()
         if not name:
-            console.print("[bold red]🚨 No snapshot name provided.[/bold red]")
+            console.print(_NO_SNAPSHOT_NAME)
             logger.warning("No snapshot name provided by the user.")
             return None
         logger.info(f"User provided snapshot name: {name}")
@@ -146,13 +221,40 @@ def prompt_for_snapshot_name() -> str | None:
         return None
 
 
+def _build_snapshot_options(snapshots: list) -> dict[str, int]:
+    """
+    Build the menu labels for a list of snapshots, mapped to their snapshot IDs.
+
+    The mapping keeps the order of the snapshots, so its keys can be used directly as
+    menu choices and a selected label resolves to its ID in constant time.
+
+    Args:
+        snapshots (list): Snapshot objects with 'snapshot_id', 'name', 'created_at' and
+            'partial'.
+
+    Returns:
+        dict[str, int]: The menu label of each snapshot mapped to its snapshot ID.
+    """
+
+    option_to_id = {}
+    for snapshot in snapshots:
+        created_at = snapshot.created_at.strftime("%Y-%m-%d %H:%M:%S")
+        label = f"{snapshot.snapshot_id}: {snapshot.name} ({created_at})"
+        if snapshot.partial:
+            label += " [partial]"
+        option_to_id[label] = snapshot.snapshot_id
+    return option_to_id
+
+
 def prompt_for_snapshots() -> tuple[int | None, int | None]:
     """
     Prompts the user to select two snapshots for comparison from a list of available snapshots.
 
     Retrieves snapshots from the database and displays them to the user for selection.
     If there are fewer than two snapshots available, informs the user and returns to the main menu.
-    Allows the user to select two snapshots using a console-based menu.
+    Allows the user to select both snapshots in a single checkbox menu; pressing Esc returns
+    to the main menu. The older of the two snapshots, the one with the lower ID, is
+    returned first.
     Handles user interruptions and other exceptions gracefully.
 
     Returns:
@@ -161,61 +263,41 @@ def prompt_for_snapshots() -> tuple[int | None, int | None]:
     """
 
     try:
-        snapshots = db_manager.get_snapshots()
+        snapshots = get_prefetched_snapshots()
         logger.debug(f"Retrieved {len(snapshots)} snapshots from the database.")
         if len(snapshots) < 2:
-            console.print(
-                "[bold red]🚨 Not enough snapshots available to compare.[/bold red]"
-            )
-            console.print(
-                "[bold cyan]Press Enter to return to the main menu...[/bold cyan]"
-            )
+            console.print(_NOT_ENOUGH_SNAPSHOTS)
+            console.print(_PRESS_ENTER)
             input()
             logger.info("Not enough snapshots to compare. Returning to main menu.")
             return None, None
 
-        options = ["🔙 Return to Main Menu"] + [
-            f"{snapshot.snapshot_id}: {snapshot.name} ({snapshot.created_at.strftime('%Y-%m-%d %H:%M:%S')})"
-            for snapshot in snapshots
-        ]
+        option_to_id = _build_snapshot_options(snapshots)
 
-        console.print(
-            "[bold cyan]🕹️ Use arrow keys to select snapshots to compare, and press Enter.[/bold cyan]"
-        )
+        console.print(_COMPARE_INSTRUCTIONS)
 
-        console.print("Select the first snapshot:")
-        selected_option1 = inquirer.select(
-            message="",
-            choices=options,
+        # Both snapshots are picked in a single widget; Esc skips the prompt
+        selected_options = inquirer.checkbox(
+            message="Select two snapshots to compare",
+            choices=list(option_to_id),
             pointer="> ",
-            default=None,
+            validate=lambda selection: len(selection) == 2,
+            invalid_message="Please select exactly 2 snapshots.",
+            mandatory=False,
+            keybindings={"skip": [{"key": "escape"}, {"key": "c-z"}]},
         ).execute()
 
-        if selected_option1 == "🔙 Return to Main Menu":
+        if not selected_options:
             logger.info(
                 "User chose to return to the main menu from snapshot selection."
             )
             return None, None
 
-        console.print("Select the second snapshot:")
-        selected_option2 = inquirer.select(
-            message="",
-            choices=options,
-            pointer="> ",
-            default=None,
-        ).execute()
-
-        if selected_option2 == "🔙 Return to Main Menu":
-            logger.info(
-                "User chose to return to the main menu from snapshot selection."
-            )
-            return None, None
-
-        idx1 = options.index(selected_option1) - 1
-        idx2 = options.index(selected_option2) - 1
-
-        snapshot1_id = snapshots[idx1].snapshot_id
-        snapshot2_id = snapshots[idx2].snapshot_id
+        # The checkbox returns the selection in list order, not in the order it was
+        # picked, so the sides are fixed explicitly: the older snapshot is snapshot 1
+        snapshot1_id, snapshot2_id = sorted(
+            option_to_id[option] for option in selected_options
+        )
 
         logger.info(
             f"User selected snapshots {snapshot1_id} and {snapshot2_id} for comparison."
@@ -245,25 +327,19 @@ def prompt_for_snapshot_id() -> int | None:
     """
 
     try:
-        snapshots = db_manager.get_snapshots()
+        snapshots = get_prefetched_snapshots()
         logger.debug(f"Retrieved {len(snapshots)} snapshots from the database.")
         if not snapshots:
-            console.print("[bold red]🚨 No snapshots available.[/bold red]")
-            console.print(
-                "[bold cyan]Press Enter to return to the main menu...[/bold cyan]"
-            )
+            console.print(_NO_SNAPSHOTS)
+            console.print(_PRESS_ENTER)
             input()
             logger.info("No snapshots available. Returning to main menu.")
             return None
 
-        options = ["🔙 Return to Main Menu"] + [
-            f"{snapshot.snapshot_id}: {snapshot.name} ({snapshot.created_at.strftime('%Y-%m-%d %H:%M:%S')})"
-            for snapshot in snapshots
-        ]
+        option_to_id = _build_snapshot_options(snapshots)
+        options = [_RETURN_TO_MENU_OPTION, *option_to_id]
 
-        console.print(
-            "[bold cyan]🕹️ Use arrow keys to select a snapshot to view, and press Enter.[/bold cyan]"
-        )
+        console.print(_VIEW_INSTRUCTIONS)
 
         console.print("Select a snapshot to view:")
         selected_option = inquirer.select(
@@ -273,14 +349,13 @@ def prompt_for_snapshot_id() -> int | None:
             default=None,
         ).execute()
 
-        if selected_option == "🔙 Return to Main Menu":
+        if selected_option == _RETURN_TO_MENU_OPTION:
             logger.info(
                 "User chose to return to the main menu from snapshot selection."
             )
             return None
 
-        idx = options.index(selected_option) - 1
-        snapshot_id = snapshots[idx].snapshot_id
+        snapshot_id = option_to_id[selected_option]
 
         logger.info(f"User selected snapshot {snapshot_id} to view.")
 
@@ -4,20 +4,39 @@
 
 import structlog
 import logging
+import logging.handlers
 import sys
 
+# Tracks whether logging has already been configured for this process
+_CONFIGURED = False
+
+# Formatter shared by the console and file handlers
+_FORMATTER = logging.Formatter(
+    "%(asctime)s [%(levelname)s] %(name)s.%(funcName)s: %(message)s"
+)
+
 
 def configure_structlog(debug: bool = False):
     """
     Configures Structlog for logging.
 
+    The configuration is applied only once per process; subsequent calls return
+    immediately so handlers (and the app.log file descriptor) are not re-created and
+    the structlog logger cache is not invalidated.
+
     Args:
       debug (bool): If True, sets the log level to DEBUG for all handlers.
                     If False, sets the log level to INFO for file handler and CRITICAL for console.
     """
 
-    # Define processors for formatting log messages
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+
+    # Define processors for formatting log messages; records below the configured
+    # level are dropped first, before they are timestamped and rendered
     processors = [
+        structlog.stdlib.filter_by_level,
         structlog.processors.TimeStamper(fmt="ISO"),
         structlog.processors.add_log_level,
         structlog.processors.format_exc_info,
@@ -40,20 +59,13 @@ def configure_structlog(debug: bool = False):
         cache_logger_on_first_use=True,
     )
 
-    # Set up standard logging for compatibility
-    logging.basicConfig(
-        level=logging.DEBUG if debug else logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s.%(funcName)s: %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),  # Console handler
-            logging.FileHandler("app.log", mode="a", encoding="utf-8"),  # File handler
-        ],
+    # Create the console and file handlers; the log file is only opened once the
+    # first record is written to it
+    console_handler = logging.StreamHandler(sys.stdout)
+    file_handler = logging.handlers.WatchedFileHandler(
+        "app.log", mode="a", encoding="utf-8", delay=True
     )
 
-    # Retrieve console and file handlers
-    console_handler = logging.getLogger().handlers[0]
-    file_handler = logging.getLogger().handlers[1]
-
     if debug:
         # If debug is enabled, log everything to both console and file
         console_handler.setLevel(logging.DEBUG)
@@ -65,9 +77,15 @@ def configure_structlog(debug: bool = False):
         # Log everything from INFO and above to file
         file_handler.setLevel(logging.INFO)
 
-    # Set formatter for console and file handlers
-    formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(name)s.%(funcName)s: %(message)s"
+    # Share a single formatter between both handlers; setting it before basicConfig
+    # keeps basicConfig from creating a formatter of its own for each handler
+    console_handler.setFormatter(_FORMATTER)
+    file_handler.setFormatter(_FORMATTER)
+
+    # Set up standard logging for compatibility
+    logging.basicConfig(
+        level=logging.DEBUG if debug else logging.INFO,
+        handlers=[console_handler, file_handler],
     )
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
+
+    _CONFIGURED = True
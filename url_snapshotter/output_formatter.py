@@ -2,12 +2,103 @@
 
 # This module provides the functionality to format and display output to the console.
 
-from rich.console import Console
-from rich.table import Table
+from rich.console import Console, Group
+from rich.style import Style
+from rich.table import Column, Table
+from rich.text import Text
+from collections.abc import Iterator
 import difflib
+import re
+from itertools import chain, islice
+from operator import itemgetter
 
+# Shared console used by the output formatter and the command handlers
 console = Console()
 
+# Styles are built once, so rendering never has to parse a style definition
+_CYAN = Style(color="cyan")
+_MAGENTA = Style(color="magenta")
+_GREEN = Style(color="green")
+_RED = Style(color="red")
+_YELLOW = Style(color="yellow")
+_BOLD_CYAN = Style(color="cyan", bold=True)
+
+# Column templates for the tables rendered below; each render takes a cheap copy
+# instead of re-declaring the columns and their styles on every call
+_SNAPSHOTS_COLUMNS = (
+    Column("ID", style=_CYAN, no_wrap=True),
+    Column("Name", style=_MAGENTA),
+    Column("Created At", style=_GREEN),
+)
+_DETAILS_COLUMNS = (
+    Column("URL", style=_CYAN),
+    Column("HTTP Code", style=_MAGENTA, no_wrap=True),
+    Column("Content Hash", style=_GREEN),
+)
+
+# Snapshots with more rows than this are printed as plain aligned lines
+_PLAIN_DETAILS_THRESHOLD = 1000
+_PLAIN_DETAILS_ROW = "{:<60} {:<9} {}"
+
+# File labels used in the unified diff headers
+_DIFF_FROM_FILE = "Snapshot 1"
+_DIFF_TO_FILE = "Snapshot 2"
+
+# Number of context lines around each change in a unified diff
+_DIFF_CONTEXT_LINES = 3
+
+# Start line numbers in a unified diff hunk header, e.g. "@@ -12,7 +12,8 @@"
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(.*?) \+(\d+)")
+
+# Number of diff lines rendered per console write while streaming a diff
+_DIFF_PRINT_BATCH_SIZE = 500
+
+# Static messages are parsed from markup once at import time instead of on every call
+_NO_SNAPSHOTS_FOUND = Text.from_markup(
+    "[bold yellow]⚠️ No snapshots found.[/bold yellow]"
+)
+_NO_DIFFERENCES = Text.from_markup(
+    "[bold green]✅ No differences found between the snapshots.[/bold green]"
+)
+_NO_CONTENT_DIFFERENCES = Text.from_markup(
+    "[bold green]No differences in content.[/bold green]"
+)
+_IDENTICAL_CONTENT = Text.from_markup(
+    "  [green]✅ Content is identical, only the HTTP code changed.[/green]"
+)
+_DIFFERENCES_HEADER = Text.from_markup(
+    "[bold magenta]--- Differences ---[/bold magenta]"
+)
+_NO_SNAPSHOT_DATA = Text.from_markup(
+    "[bold yellow]⚠️ No data found for this snapshot.[/bold yellow]"
+)
+
+# Prompt shown before rendering the content differences of a URL
+_SHOW_DIFF_PROMPT = "📝 Do you want to see the content differences for {url}? (y/N):"
+
+
+def _new_table(title: str, columns: tuple[Column, ...]) -> Table:
+    """
+    Create an empty table from a tuple of column templates.
+
+    Rows are expected to be added as Text cells, which Rich renders without running the
+    markup parser, and highlighting is disabled so cells are not scanned with regexes.
+
+    Args:
+        title (str): The title of the table.
+        columns (tuple[Column, ...]): The column templates to copy into the table.
+
+    Returns:
+        Table: A new table with fresh copies of the given columns.
+    """
+
+    return Table(
+        *(column.copy() for column in columns),
+        title=title,
+        show_lines=True,
+        highlight=False,
+    )
+
 
 def display_snapshots_list(snapshots: list):
     """
@@ -15,30 +106,135 @@ def display_snapshots_list(snapshots: list):
 
     Args:
         snapshots (list): A list of snapshot objects. Each snapshot object is expected to have
-                          the attributes 'snapshot_id', 'name', and 'created_at'.
+                          the attributes 'snapshot_id', 'name', 'created_at' and 'partial'.
+                          Partial snapshots are marked as such.
 
     Returns:
         None: This function prints the formatted table to the console.
     """
 
     if not snapshots:
-        console.print("[bold yellow]⚠️ No snapshots found.[/bold yellow]")
+        console.print(_NO_SNAPSHOTS_FOUND)
         return
 
-    table = Table(title="Available Snapshots", show_lines=True)
-    table.add_column("ID", style="cyan", no_wrap=True)
-    table.add_column("Name", style="magenta")
-    table.add_column("Created At", style="green")
+    table = _new_table("Available Snapshots", _SNAPSHOTS_COLUMNS)
 
     for snapshot in snapshots:
+        name = Text(snapshot.name)
+        if snapshot.partial:
+            name.append(" (partial)", style=_YELLOW)
         table.add_row(
-            str(snapshot.snapshot_id),
-            snapshot.name,
-            snapshot.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            Text(str(snapshot.snapshot_id)),
+            name,
+            Text(snapshot.created_at.strftime("%Y-%m-%d %H:%M:%S")),
         )
     console.print(table)
 
 
+def _style_diff_line(line: str) -> Text:
+    """
+    Convert a unified diff line into a styled Text object.
+
+    Args:
+        line (str): A single line of unified diff output.
+
+    Returns:
+        Text: The line styled green for additions, red for deletions and unstyled otherwise.
+    """
+
+    if line.startswith("+"):
+        return Text(line, style=_GREEN)
+    if line.startswith("-"):
+        return Text(line, style=_RED)
+    return Text(line)
+
+
+def _split_lines(content: str, cache: dict[str, list[str]]) -> list[str]:
+    """
+    Split content into lines, reusing an earlier result for identical content.
+
+    Args:
+        content (str): The content to split.
+        cache (dict[str, list[str]]): Previously split content, keyed by the content itself.
+
+    Returns:
+        list[str]: The lines of the content.
+    """
+
+    lines = cache.get(content)
+    if lines is None:
+        lines = cache[content] = content.splitlines()
+    return lines
+
+
+def _unified_diff(lines1: list[str], lines2: list[str]) -> Iterator[str]:
+    """
+    Create a unified diff, skipping the lines the contents start and end with in common.
+
+    difflib matches every line of both inputs, even though snapshots of a page tend to
+    differ in a small region only. The common leading and trailing lines (minus the
+    context lines) are cut off before diffing and the hunk headers are shifted back. The
+    result is an equivalent diff of the full contents, although a change next to repeated
+    lines may be placed at another, equally valid position.
+
+    Args:
+        lines1 (list[str]): The lines of the first content.
+        lines2 (list[str]): The lines of the second content.
+
+    Returns:
+        Iterator[str]: The lines of the unified diff.
+    """
+
+    limit = min(len(lines1), len(lines2))
+    prefix = 0
+    while prefix < limit and lines1[prefix] == lines2[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and lines1[-1 - suffix] == lines2[-1 - suffix]:
+        suffix += 1
+
+    start = max(prefix - _DIFF_CONTEXT_LINES, 0)
+    trailing = max(suffix - _DIFF_CONTEXT_LINES, 0)
+
+    diff_lines = difflib.unified_diff(
+        lines1[start : len(lines1) - trailing],
+        lines2[start : len(lines2) - trailing],
+        fromfile=_DIFF_FROM_FILE,
+        tofile=_DIFF_TO_FILE,
+        lineterm="",
+        n=_DIFF_CONTEXT_LINES,
+    )
+    if not start:
+        return diff_lines
+
+    def shift(match: re.Match) -> str:
+        line1, rest, line2 = match.groups()
+        return f"@@ -{int(line1) + start}{rest} +{int(line2) + start}"
+
+    return (
+        _HUNK_HEADER.sub(shift, line, count=1) if line.startswith("@@") else line
+        for line in diff_lines
+    )
+
+
+def _print_diff_lines(diff_lines: Iterator[str]):
+    """
+    Stream unified diff lines to the console in fixed-size batches.
+
+    The diff generator is consumed incrementally, so the first lines are shown before
+    the rest of the diff has been computed and the full diff is never held in memory.
+
+    Args:
+        diff_lines (Iterator[str]): The unified diff lines to print.
+
+    Returns:
+        None
+    """
+
+    while batch := list(islice(diff_lines, _DIFF_PRINT_BATCH_SIZE)):
+        console.print(Group(*map(_style_diff_line, batch)), highlight=False)
+
+
 def display_differences(differences: list[dict[str, any]]):
     """
     Display content differences between snapshots.
@@ -50,6 +246,8 @@ def display_differences(differences: list[dict[str, any]]):
             - "url": The URL of the snapshot.
             - "snapshot1_http_code": HTTP status code of the first snapshot.
             - "snapshot2_http_code": HTTP status code of the second snapshot.
+            - "snapshot1_content_hash": Content hash of the first snapshot.
+            - "snapshot2_content_hash": Content hash of the second snapshot.
             - "snapshot1_full_content": Full content of the first snapshot.
             - "snapshot2_full_content": Full content of the second snapshot.
 
@@ -58,86 +256,118 @@ def display_differences(differences: list[dict[str, any]]):
           will be printed.
         - For each difference, the URL and HTTP status codes of both snapshots
           will be printed.
-        - The user will be prompted to see the content differences for each URL.
+        - URLs whose content hashes or contents match are reported as identical
+          without computing a diff.
+        - The user will be prompted to see the content differences for each
+          other URL.
         - If the user opts to see the differences, a unified diff of the
           content will be displayed, with additions in green and deletions in red.
     """
 
     if not differences:
-        console.print(
-            "[bold green]✅ No differences found between the snapshots.[/bold green]"
-        )
+        console.print(_NO_DIFFERENCES)
         return
 
+    # Split content is shared between URLs that return the same body (e.g. a global
+    # error page), so each distinct body is only split into lines once
+    split_cache: dict[str, list[str]] = {}
+
     for diff in differences:
         url = diff["url"]
         code1 = diff["snapshot1_http_code"]
         code2 = diff["snapshot2_http_code"]
         content1 = diff["snapshot1_full_content"]
         content2 = diff["snapshot2_full_content"]
-        console.print(f"[bold cyan]🌐 URL: {url}[/bold cyan]")
-        console.print(f"  [yellow]📄 Snapshot 1 - HTTP Code: {code1}[/yellow]")
-        console.print(f"  [yellow]📄 Snapshot 2 - HTTP Code: {code2}[/yellow]")
+        # Styled Text skips the markup parser, which also keeps a "[" in a URL literal
+        console.print(
+            Text(f"🌐 URL: {url}", style=_BOLD_CYAN),
+            Text(f"  📄 Snapshot 1 - HTTP Code: {code1}", style=_YELLOW),
+            Text(f"  📄 Snapshot 2 - HTTP Code: {code2}", style=_YELLOW),
+            sep="\n",
+            highlight=False,
+        )
+
+        # Matching hashes or contents leave nothing to diff; comparing two strings is a
+        # single memory comparison, far cheaper than splitting and diffing them
+        if (
+            diff["snapshot1_content_hash"] == diff["snapshot2_content_hash"]
+            or content1 == content2
+        ):
+            console.print(_IDENTICAL_CONTENT)
+            continue
 
         # Prompt user to see content differences
-        show_diff = (
-            console.input(
-                f"[bold cyan]📝 Do you want to see the content differences for {url}? (y/N):[/bold cyan] "
-            ).lower()
-            == "y"
-        )
+        prompt = Text(_SHOW_DIFF_PROMPT.format(url=url), style=_BOLD_CYAN, end="")
+        prompt.append(" ")
+        show_diff = console.input(prompt).lower() == "y"
 
         if show_diff:
-            diff_lines = list(
-                difflib.unified_diff(
-                    content1.splitlines(),
-                    content2.splitlines(),
-                    fromfile="Snapshot 1",
-                    tofile="Snapshot 2",
-                    lineterm="",
-                )
+            diff_lines = _unified_diff(
+                _split_lines(content1, split_cache),
+                _split_lines(content2, split_cache),
             )
-            if diff_lines:
-                console.print("[bold magenta]--- Differences ---[/bold magenta]")
-                for line in diff_lines:
-                    if line.startswith("+"):
-                        console.print(line, style="green", highlight=False)
-                    elif line.startswith("-"):
-                        console.print(line, style="red", highlight=False)
-                    else:
-                        console.print(line, highlight=False)
-            else:
-                console.print("[bold green]No differences in content.[/bold green]")
+
+            # Peek at the first line to detect an empty diff without consuming it
+            first_line = next(diff_lines, None)
+            if first_line is None:
+                console.print(_NO_CONTENT_DIFFERENCES)
+                continue
+
+            console.print(_DIFFERENCES_HEADER)
+            _print_diff_lines(chain((first_line,), diff_lines))
+
+
+def _format_hash(content_hash: bytes | str) -> str:
+    """
+    Format a content hash for display.
+
+    Args:
+        content_hash (bytes | str): The raw digest, or a placeholder such as "N/A".
+
+    Returns:
+        str: The digest as a hexadecimal string, or the placeholder unchanged.
+    """
+
+    return content_hash.hex() if isinstance(content_hash, bytes) else content_hash
 
 
 def display_snapshot_details(snapshot_data: list[dict[str, any]]):
     """
     Display the details of a specific snapshot in a formatted table.
 
+    Snapshots with more than _PLAIN_DETAILS_THRESHOLD rows are printed as plain,
+    fixed-width lines instead, since laying out a Rich table of that size is slow.
+
     Args:
         snapshot_data (list[dict[str, any]]): A list of dictionaries containing snapshot details.
             Each dictionary should have the following keys:
             - "url" (str): The URL of the snapshot.
             - "http_code" (int): The HTTP status code of the snapshot.
-            - "content_hash" (str): The hash of the snapshot content.
+            - "content_hash" (bytes): The raw digest of the snapshot content.
 
     Returns:
         None
     """
 
     if not snapshot_data:
-        console.print("[bold yellow]⚠️ No data found for this snapshot.[/bold yellow]")
+        console.print(_NO_SNAPSHOT_DATA)
+        return
+
+    get_row = itemgetter("url", "http_code", "content_hash")
+
+    # Large snapshots skip Rich's table layout, which dominates the render time
+    if len(snapshot_data) > _PLAIN_DETAILS_THRESHOLD:
+        lines = [_PLAIN_DETAILS_ROW.format("URL", "HTTP Code", "Content Hash")]
+        lines.extend(
+            _PLAIN_DETAILS_ROW.format(url, str(http_code), _format_hash(content_hash))
+            for url, http_code, content_hash in map(get_row, snapshot_data)
+        )
+        console.print("\n".join(lines), markup=False, highlight=False, soft_wrap=True)
         return
 
-    table = Table(title="Snapshot Details", show_lines=True)
-    table.add_column("URL", style="cyan")
-    table.add_column("HTTP Code", style="magenta")
-    table.add_column("Content Hash", style="green")
+    table = _new_table("Snapshot Details", _DETAILS_COLUMNS)
 
-    for entry in snapshot_data:
-        url = entry["url"]
-        http_code = str(entry["http_code"])
-        content_hash = entry["content_hash"]
-        table.add_row(url, http_code, content_hash)
+    for url, http_code, content_hash in map(get_row, snapshot_data):
+        table.add_row(Text(url), Text(str(http_code)), Text(_format_hash(content_hash)))
 
     console.print(table)
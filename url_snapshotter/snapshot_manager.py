@@ -3,46 +3,247 @@
 # This module provides the functionality to manage URL snapshots, including creating, fetching, comparing, and viewing snapshots.
 
 import asyncio
+import atexit
+import os
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+import aiohttp
 import structlog
-from url_snapshotter.db_utils import DatabaseManager
-from url_snapshotter.async_requests import fetch_all_urls
-from url_snapshotter.content_utils import clean_content, hash_content
-from rich.markup import escape
+from url_snapshotter.db_utils import DatabaseManager, get_database_manager
+from url_snapshotter.async_requests import create_session, fetch_all_urls
+from url_snapshotter.content_utils import (
+    HASH_ALGORITHM,
+    HASH_FUNCTIONS,
+    LEGACY_HASH_ALGORITHM,
+    clean_content,
+    compress_content,
+    decompress_content,
+    hash_content,
+    hash_raw_content,
+)
 
 logger = structlog.get_logger()
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-@dataclass
+# Event loop implementation for fetching. The libuv-based uvloop is used when the
+# optional package is installed, otherwise asyncio's default loop.
+_LOOP_FACTORY = uvloop.new_event_loop if uvloop is not None else None
+
+# Upper bound on the number of fetched pages sent to a worker process in one call
+_CLEAN_CHUNK_SIZE = 32
+
+# Number of chunks per worker process that may be cleaned or wait to be handed over at
+# once; fetching waits for the oldest chunk beyond that
+_CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Number of stored URLs sent to a worker process in one call when rehashing a snapshot
+_REHASH_CHUNK_SIZE = 256
+
+# Number of processed URLs stored at a time while a snapshot is created
+_SAVE_BATCH_SIZE = 500
+
+# Number of cleaned chunks that may wait to be stored while a snapshot is created
+_STORE_QUEUE_SIZE = 32
+
+# Number of changed URLs named in the summary logged for a comparison
+_LOGGED_URLS = 20
+
+# Number of snapshot comparisons whose differences are kept for reuse
+_DIFF_CACHE_SIZE = 32
+
+# Number of loaded snapshots kept in memory for repeated views
+_SNAPSHOT_CACHE_SIZE = 8
+
+
+@dataclass(slots=True, frozen=True)
 class URLSnapshot:
     """
     Represents a single URL snapshot with its metadata.
+
+    This is the record passed through the fetch pipeline; as a slotted dataclass it is
+    much smaller than the equivalent dictionary and its fields are read by offset. The
+    full content is held as stored: UTF-8 encoded and compressed with compress_content().
     """
 
     url: str
-    http_code: str
-    content_hash: str
-    full_content: str
+    http_code: int | str
+    content_hash: bytes
+    full_content: bytes
+    raw_hash: bytes | None = None
 
-    def is_different(self, other: "URLSnapshot") -> bool:
-        """
-        Compare this snapshot with another to check for differences.
 
-        Args:
-            other (URLSnapshot): The other URLSnapshot to compare.
+def _clean_and_hash(result: dict) -> URLSnapshot:
+    """
+    Process the result of a fetched URL by cleaning its content and generating a content hash.
 
-        Returns:
-            bool: True if any meaningful field is different, False otherwise.
-        """
-        return (
-            self.http_code != other.http_code or self.content_hash != other.content_hash
+    This is a module-level function so it can be pickled and run in a worker process.
+
+    The fetched body is decoded here, and the cleaned content is returned UTF-8 encoded
+    and compressed, ready to be stored without further work in the main process.
+
+    Args:
+        result (dict): A dictionary containing URL fetch details.
+
+    Returns:
+        URLSnapshot: The URL details including HTTP code, content hash, and cleaned full content.
+    """
+    url = result.get("url", "")
+    http_code = result.get("status") or result.get("http_code", "Unknown")
+    content = result.get("content") or b""
+    raw_hash = result.get("raw_hash")
+
+    try:
+        if content:
+            text = content.decode(result.get("encoding") or "utf-8", "replace")
+            cleaned_content = clean_content(text, url).encode("utf-8")
+            content_hash = hash_content(cleaned_content)
+            logger.debug("Processed URL", url=url, http_code=http_code)
+            return URLSnapshot(
+                url,
+                http_code,
+                content_hash,
+                compress_content(cleaned_content),
+                raw_hash,
+            )
+        else:
+            logger.warning("No content for URL", url=url, http_code=http_code)
+            return URLSnapshot(url, http_code, b"", b"")
+    except Exception as e:
+        logger.error(f"Error processing URL: {url}", error=str(e), http_code=http_code)
+        return URLSnapshot(url, http_code, b"", b"")
+
+
+def _clean_and_hash_chunk(results: list[dict]) -> list[URLSnapshot]:
+    """
+    Clean and hash a chunk of fetched URLs in a single worker process call.
+
+    Args:
+        results (list[dict]): Dictionaries containing URL fetch details.
+
+    Returns:
+        list[URLSnapshot]: The processed URL data, in the same order.
+    """
+    return [_clean_and_hash(result) for result in results]
+
+
+def _rehash_chunk(
+    rows: list[tuple], algorithm: str
+) -> list[tuple[str, tuple[int, bytes]]]:
+    """
+    Rehash the stored content of a chunk of URLs in a single worker process call.
+
+    Args:
+        rows (list[tuple]): The (url, http_code, content_hash, full_content) of each URL,
+            with the content as stored in the database.
+        algorithm (str): The name of the hash algorithm to use.
+
+    Returns:
+        list[tuple[str, tuple[int, bytes]]]: The URL and fingerprint of each row, in the
+        same order. URLs without content keep their empty hash.
+    """
+    return [
+        (
+            url,
+            (
+                http_code,
+                (
+                    hash_content(decompress_content(content), algorithm)
+                    if content
+                    else content_hash
+                ),
+            ),
         )
+        for url, http_code, content_hash, content in rows
+    ]
+
+
+def _last_per_url(
+    fingerprints: Iterable[tuple[str, tuple[int, bytes]]],
+) -> Iterator[tuple[str, tuple[int, bytes]]]:
+    """
+    Yield one fingerprint per URL from a stream sorted by URL.
+
+    Snapshots stored before URLs were de-duplicated may list a URL more than once. Like
+    a dict keyed by URL, the last of them is kept.
+
+    Args:
+        fingerprints (Iterable[tuple[str, tuple[int, bytes]]]): The URL and fingerprint
+            of each row, sorted by URL.
+
+    Yields:
+        tuple[str, tuple[int, bytes]]: The URL and fingerprint, once per URL.
+    """
+    previous = None
+    for row in fingerprints:
+        if previous is not None and row[0] != previous[0]:
+            yield previous
+        previous = row
+    if previous is not None:
+        yield previous
+
+
+def _difference(
+    url: str,
+    fingerprint1: tuple[int | str, bytes | str],
+    fingerprint2: tuple[int | str, bytes | str],
+) -> dict[str, str]:
+    """
+    Build the difference of a URL between two snapshots.
+
+    Args:
+        url (str): The URL.
+        fingerprint1 (tuple[int | str, bytes | str]): The (http_code, content_hash) in the
+            first snapshot, or ("N/A", "N/A") if it is missing there.
+        fingerprint2 (tuple[int | str, bytes | str]): The same for the second snapshot.
+
+    Returns:
+        dict[str, str]: The difference, in the form yielded by SnapshotManager._iter_differences().
+    """
+    return {
+        "url": url,
+        "snapshot1_http_code": fingerprint1[0],
+        "snapshot2_http_code": fingerprint2[0],
+        "snapshot1_content_hash": fingerprint1[1],
+        "snapshot2_content_hash": fingerprint2[1],
+    }
+
+
+def _swap_sides(diff: dict[str, str]) -> dict[str, str]:
+    """
+    Swap the snapshot1 and snapshot2 fields of a difference between two snapshots.
+
+    Args:
+        diff (dict[str, str]): A difference as yielded by SnapshotManager._iter_differences().
+
+    Returns:
+        dict[str, str]: A new difference with the sides of the snapshots swapped.
+    """
+    return {
+        "url": diff["url"],
+        "snapshot1_http_code": diff["snapshot2_http_code"],
+        "snapshot2_http_code": diff["snapshot1_http_code"],
+        "snapshot1_content_hash": diff["snapshot2_content_hash"],
+        "snapshot2_content_hash": diff["snapshot1_content_hash"],
+    }
 
 
 class SnapshotManager:
     """
     SnapshotManager is responsible for managing URL snapshots, including creating, fetching, comparing, and viewing snapshots.
 
+    The manager keeps one asyncio runner and one aiohttp session alive across snapshots, so
+    connection pools, DNS lookups and TLS sessions are reused. Cleaning and hashing run in
+    a process pool, so they neither block the event loop nor contend for the GIL. Call
+    close() to release these resources.
+
     Args:
         db_manager (DatabaseManager): An instance of DatabaseManager to handle database operations.
     """
@@ -55,40 +256,146 @@ class SnapshotManager:
             db_manager (DatabaseManager): An instance of DatabaseManager to handle database operations.
         """
         self.db_manager = db_manager
+        self._runner: asyncio.Runner | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._session_concurrency: int | None = None
+        # Worker processes are only started once the first page is submitted
+        self._cpu_workers = os.cpu_count() or 1
+        self._cpu = ProcessPoolExecutor(max_workers=self._cpu_workers)
+        # Loads the two snapshots of a comparison concurrently
+        self._db_io = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="snapshot-load"
+        )
+        # Computes the differences of the comparison that is likely to follow. It is
+        # separate from _db_io, which it submits loads to, so it cannot starve them.
+        self._prefetcher = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="snapshot-prefetch"
+        )
+        # Pending or memoized differences by (older_id, newer_id), least recently used
+        # first; only used from the calling thread
+        self._diff_futures: OrderedDict[tuple[int, int], Future] = OrderedDict()
+        # Snapshot data without content by snapshot ID, least recently used first; only
+        # used from the calling thread, as viewing is the only user and never prefetches
+        self._snapshot_cache: OrderedDict[int, list] = OrderedDict()
+
+    def close(self):
+        """
+        Shut down the worker processes and threads, and close the shared aiohttp session
+        and asyncio runner, if they were created.
+        """
+        self._cpu.shutdown(cancel_futures=True)
+        self._prefetcher.shutdown(cancel_futures=True)
+        self._db_io.shutdown(cancel_futures=True)
+
+        if self._runner is None:
+            return
+
+        if self._session is not None:
+            self._runner.run(self._session.close())
+            self._session = None
+
+        self._runner.close()
+        self._runner = None
+
+    def _run(self, coro):
+        """
+        Run a coroutine to completion on the manager's long-lived asyncio runner.
+
+        The runner's event loop is created on first use and reused by later calls,
+        instead of building and tearing down a loop per snapshot like asyncio.run().
+
+        Args:
+            coro (Coroutine): The coroutine to run.
+
+        Returns:
+            Any: The result of the coroutine.
+        """
+        if self._runner is None:
+            self._runner = asyncio.Runner(loop_factory=_LOOP_FACTORY)
+        return self._runner.run(coro)
+
+    async def _get_session(self, concurrent: int) -> aiohttp.ClientSession:
+        """
+        Return the shared aiohttp session, creating it on first use.
 
-    def view_snapshot(self, snapshot_id: int) -> list[dict[str, str]]:
+        The session's connection limit is tied to the concurrency level, so it is
+        replaced when a snapshot asks for a different level.
+
+        Args:
+            concurrent (int): The number of concurrent requests to allow.
+
+        Returns:
+            aiohttp.ClientSession: The shared client session.
+        """
+        if self._session is not None and self._session_concurrency != concurrent:
+            await self._session.close()
+            self._session = None
+
+        if self._session is None or self._session.closed:
+            self._session = create_session(concurrent)
+            self._session_concurrency = concurrent
+
+        return self._session
+
+    def view_snapshot(
+        self,
+        snapshot_id: int,
+        *,
+        offset: int = 0,
+        limit: int | None = None,
+        with_content: bool = False,
+    ) -> list[dict[str, str]]:
         """
         Retrieve and view the details of a specific snapshot.
 
+        The full content of each URL is only loaded when requested, so a summary of a
+        large snapshot can be shown without transferring every page from the database.
+
         Args:
             snapshot_id (int): The unique identifier of the snapshot to retrieve.
+            offset (int, optional): The number of URLs to skip. Defaults to 0.
+            limit (int | None, optional): The maximum number of URLs to retrieve, or None
+                to retrieve all of them. Defaults to None.
+            with_content (bool, optional): Whether to include the full content of each URL.
+                Defaults to False.
 
         Returns:
             list[dict[str, str]]: A list of dictionaries containing the snapshot details.
-                                Each dictionary includes URL, HTTP code, content hash,
-                                and the full cleaned content of the snapshot.
-                                Returns an empty list if no data is found or an error occurs.
+                                Each dictionary includes URL, HTTP code and content hash,
+                                plus the full cleaned content if with_content is True. The
+                                content is not escaped; escape it only when printing it as
+                                markup. Returns an empty list if no data is found or an
+                                error occurs.
         """
-        logger.info("Viewing snapshot", snapshot_id=snapshot_id)
+        logger.info(
+            "Viewing snapshot", snapshot_id=snapshot_id, offset=offset, limit=limit
+        )
 
         try:
-            # Retrieve snapshot data from the database
-            snapshot_data = self.db_manager.get_snapshot_data(snapshot_id)
+            # Retrieve snapshot data from the database; whole snapshots without content
+            # are cached, as they are viewed repeatedly
+            if offset == 0 and limit is None and not with_content:
+                snapshot_data = self._load_cached(snapshot_id)
+            else:
+                snapshot_data = self.db_manager.get_snapshot_data(
+                    snapshot_id, offset=offset, limit=limit, with_content=with_content
+                )
 
             if not snapshot_data:
                 logger.warning("No data found for snapshot", snapshot_id=snapshot_id)
                 return []
 
             # Format snapshot data into list of dicts for display
-            formatted_data = [
-                {
-                    "url": entry["url"],
-                    "http_code": entry.get("http_code", "Unknown"),
-                    "content_hash": entry.get("content_hash", ""),
-                    "full_content": escape(entry.get("full_content", "")),
+            formatted_data = []
+            for entry in snapshot_data:
+                formatted_entry = {
+                    "url": entry.url,
+                    "http_code": entry.http_code,
+                    "content_hash": entry.content_hash,
                 }
-                for entry in snapshot_data
-            ]
+                if with_content:
+                    formatted_entry["full_content"] = entry.full_content or ""
+                formatted_data.append(formatted_entry)
 
             logger.info("Successfully retrieved snapshot data", snapshot_id=snapshot_id)
             return formatted_data
@@ -102,125 +409,383 @@ class SnapshotManager:
             return []
 
     def create_snapshot(
-        self, urls: list[str], name: str, concurrent: int, batch_size: int = 25
-    ):
+        self,
+        urls: list[str],
+        name: str,
+        concurrent: int,
+        resume_from: int | None = None,
+    ) -> int:
         """
         Create a snapshot of the provided URLs and save it to the database.
 
+        Duplicate URLs are fetched and stored once. Processed URLs are stored in batches
+        while the remaining ones are fetched, so if creating the snapshot fails, it is left
+        partial with the URLs stored so far. Passing its ID as resume_from completes it
+        without fetching those URLs again.
+
         Args:
             urls (list[str]): A list of URLs to be included in the snapshot.
-            name (str): The name to assign to the snapshot.
+            name (str): The name to assign to the snapshot. Ignored when resuming.
             concurrent (int): The number of concurrent requests to make while fetching URLs.
-            batch_size (int): Number of URLs to fetch concurrently per batch to optimize performance.
+            resume_from (int | None, optional): The ID of a partial snapshot to complete.
+                Defaults to None.
+
+        Returns:
+            int: The ID of the snapshot.
+
+        Raises:
+            ValueError: If resume_from is not a partial snapshot that can be completed.
+            RuntimeError: If creating the snapshot fails after it was started.
+            Exception: If an error occurs before the snapshot was started.
         """
         logger.info(
-            "Creating snapshot", name=name, concurrent=concurrent, total_urls=len(urls)
+            "Creating snapshot",
+            name=name,
+            concurrent=concurrent,
+            total_urls=len(urls),
+            resume_from=resume_from,
         )
 
+        # URLs are unique within a snapshot, which the SQL diff and the merge walk rely
+        # on; a URL listed twice is fetched once
+        urls = list(dict.fromkeys(urls))
+
+        snapshot_id = None
         try:
-            # Use asyncio.run to perform async fetch and clean
-            url_data = asyncio.run(
-                self.fetch_and_clean_urls(urls, concurrent, batch_size)
+            if resume_from is None:
+                snapshot_id = self.db_manager.start_snapshot(name)
+            else:
+                snapshot_id = self._check_resumable(resume_from)
+                stored_urls = self.db_manager.get_stored_urls(snapshot_id)
+                urls = [url for url in urls if url not in stored_urls]
+                logger.info(
+                    "Resuming snapshot",
+                    snapshot_id=snapshot_id,
+                    stored=len(stored_urls),
+                    remaining=len(urls),
+                )
+
+            # Cleaning results of earlier snapshots, reused for unchanged pages
+            known_raw_hashes = self.db_manager.get_latest_raw_hashes()
+
+            # Fetch, clean and store on the long-lived event loop
+            self._run(
+                self._fetch_and_store_urls(
+                    snapshot_id, urls, concurrent, known_raw_hashes
+                )
             )
 
-            # Save the snapshot to the database
-            self.db_manager.save_snapshot(name, url_data)
-            logger.info("Snapshot creation completed", name=name)
+            self.db_manager.complete_snapshot(snapshot_id)
+            logger.info("Snapshot creation completed", snapshot_id=snapshot_id)
+            return snapshot_id
         except Exception as e:
-            self._log_exception("An error occurred while creating snapshot", e)
+            self._log_exception(
+                "An error occurred while creating snapshot",
+                e,
+                {"snapshot_id": snapshot_id},
+            )
+            if snapshot_id is None:
+                raise
+            raise RuntimeError(
+                f"Snapshot {snapshot_id} was left partial and can be resumed: {e}"
+            ) from e
+        finally:
+            if snapshot_id is not None:
+                self._clear_snapshot_cache()
+
+    def _check_resumable(self, snapshot_id: int) -> int:
+        """
+        Check that a snapshot is partial and hashed with the current algorithm.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot to resume.
+
+        Returns:
+            int: The ID of the snapshot.
+
+        Raises:
+            ValueError: If the snapshot does not exist, is complete, or was hashed with
+                another algorithm.
+        """
+        snapshot = self.db_manager.get_snapshot(snapshot_id)
+        if snapshot is None:
+            raise ValueError(f"Snapshot {snapshot_id} does not exist.")
+        if not snapshot.partial:
+            raise ValueError(f"Snapshot {snapshot_id} is already complete.")
+        if snapshot.hash_algorithm != HASH_ALGORITHM:
+            raise ValueError(
+                f"Snapshot {snapshot_id} was hashed with {snapshot.hash_algorithm} "
+                f"and cannot be resumed with {HASH_ALGORITHM}."
+            )
+        return snapshot_id
+
+    async def _fetch_and_store_urls(
+        self,
+        snapshot_id: int,
+        urls: list[str],
+        concurrent: int,
+        known_raw_hashes: dict[str, tuple[bytes, bytes, int]],
+    ):
+        """
+        Fetch and clean URLs, storing the results in batches as they become available.
+
+        Results are handed to a writer task through a bounded queue. Once it is full,
+        cleaned chunks wait for the writer, and as _clean_urls() caps the chunks in flight,
+        fetching waits too instead of piling up pages and results in memory. If fetching fails, the results
+        received so far are still stored before the error is raised. If storing fails,
+        fetching is cancelled right away.
+
+        Args:
+            snapshot_id (int): The ID of the partial snapshot to store the results in.
+            urls (list[str]): A list of URLs to fetch.
+            concurrent (int): The number of concurrent fetch operations.
+            known_raw_hashes (dict[str, tuple[bytes, bytes, int]]): Earlier results, as
+                passed to fetch_and_clean_urls().
+        """
+        queue = asyncio.Queue(maxsize=_STORE_QUEUE_SIZE)
+        writer = asyncio.create_task(self._store_results(snapshot_id, queue))
+        fetching = asyncio.create_task(
+            self._clean_urls(urls, concurrent, known_raw_hashes, queue.put)
+        )
+
+        # The writer only finishes before the end of the queue is put if it failed
+        await asyncio.wait((writer, fetching), return_when=asyncio.FIRST_COMPLETED)
+        if writer.done():
+            fetching.cancel()
+            await asyncio.gather(fetching, return_exceptions=True)
+            writer.result()
+
+        try:
+            await fetching
+        finally:
+            # A full queue is only waited on while the writer can still drain it
+            end = asyncio.ensure_future(queue.put(None))
+            await asyncio.wait((end, writer), return_when=asyncio.FIRST_COMPLETED)
+            end.cancel()
+            await writer
+
+    async def _store_results(self, snapshot_id: int, queue: asyncio.Queue):
+        """
+        Store the results put into a queue in batches of _SAVE_BATCH_SIZE, until None is put.
+
+        Args:
+            snapshot_id (int): The ID of the partial snapshot to store the results in.
+            queue (asyncio.Queue): Lists of URLSnapshot results, followed by None.
+        """
+        loop = asyncio.get_running_loop()
+
+        async def store(batch):
+            # In-memory databases are not shared between threads
+            if self.db_manager.use_in_memory_db:
+                self.db_manager.add_url_snapshots(snapshot_id, batch)
+            else:
+                await loop.run_in_executor(
+                    self._db_io, self.db_manager.add_url_snapshots, snapshot_id, batch
+                )
+
+        batch = []
+        while (results := await queue.get()) is not None:
+            batch.extend(results)
+            if len(batch) >= _SAVE_BATCH_SIZE:
+                await store(batch)
+                batch = []
+        if batch:
+            await store(batch)
 
     async def fetch_and_clean_urls(
-        self, urls: list[str], concurrent: int, batch_size: int
-    ) -> list[dict[str, str | int]]:
+        self,
+        urls: list[str],
+        concurrent: int,
+        known_raw_hashes: dict[str, tuple[bytes, bytes, int]] | None = None,
+    ) -> list[URLSnapshot]:
         """
-        Fetch URLs asynchronously in batches and clean their content.
+        Fetch URLs asynchronously and clean their content.
+
+        Snapshots are created with create_snapshot(), which stores results as they are
+        ready; this method is only kept for external callers that need all results in
+        memory.
 
         Args:
             urls (list[str]): A list of URLs to fetch.
             concurrent (int): The number of concurrent fetch operations.
-            batch_size (int): The size of each batch of URLs to fetch concurrently.
+            known_raw_hashes (dict[str, tuple[bytes, bytes, int]] | None, optional): The raw hash,
+                content hash and snapshot ID of earlier results, keyed by URL, as returned by
+                DatabaseManager.get_latest_raw_hashes(). Defaults to None.
 
         Returns:
-            list[dict[str, str | int]]: A list of dictionaries containing the URL, HTTP code,
-            content hash, and cleaned full content.
+            list[URLSnapshot]: The URL, HTTP code, content hash, and cleaned full content of
+            each URL, in the order of `urls`. URLs that could not be fetched are left out.
         """
-        logger.info("Starting to fetch and clean URLs", total=len(urls))
-
         all_results = []
 
-        # Process URLs in batches to avoid overloading system or API rate limits
-        for i in range(0, len(urls), batch_size):
-            batch = urls[i : i + batch_size]
-            try:
-                batch_results = await self._fetch_urls_batch(batch, concurrent)
-                all_results.extend(batch_results)
-            except Exception as e:
-                self._log_exception(
-                    "Error fetching a batch of URLs", e, {"batch_size": len(batch)}
-                )
+        async def collect(results):
+            all_results.extend(results)
+
+        await self._clean_urls(urls, concurrent, known_raw_hashes, collect)
 
+        # Restore the input order, which completion order does not preserve
+        position = {url: index for index, url in enumerate(urls)}
+        all_results.sort(key=lambda result: position[result.url])
         return all_results
 
-    async def _fetch_urls_batch(
-        self, urls_batch: list[str], concurrent: int
-    ) -> list[dict[str, str | int]]:
+    async def _clean_urls(
+        self,
+        urls: list[str],
+        concurrent: int,
+        known_raw_hashes: dict[str, tuple[bytes, bytes, int]] | None,
+        on_results: Callable[[list[URLSnapshot]], Awaitable[None]],
+    ) -> dict[str, int]:
         """
-        Fetch a batch of URLs concurrently.
+        Fetch URLs asynchronously and hand over their cleaned results as they are ready.
+
+        Fetched pages are streamed from fetch_all_urls() and handed to the process pool in
+        chunks as they arrive, so cleaning overlaps with the remaining downloads while the
+        inter-process overhead is paid once per chunk. Pages whose raw content is unchanged
+        since an earlier snapshot are not cleaned again; their cleaned content and hash are
+        copied from that snapshot instead, in batches of _SAVE_BATCH_SIZE.
+
+        At most _CHUNKS_IN_FLIGHT_PER_WORKER chunks per worker are cleaned or wait to be
+        handed over; beyond that, fetching waits for the oldest chunk. As on_results may
+        wait too, for example on a full queue, a slow consumer slows down fetching and
+        memory use does not grow with the number of URLs.
+
+        If fetching fails, the pages fetched so far are still cleaned and handed over
+        before the error is raised.
 
         Args:
-            urls_batch (list[str]): A batch of URLs to fetch.
+            urls (list[str]): A list of URLs to fetch.
             concurrent (int): The number of concurrent fetch operations.
+            known_raw_hashes (dict[str, tuple[bytes, bytes, int]] | None): Earlier results,
+                as passed to fetch_and_clean_urls().
+            on_results (Callable[[list[URLSnapshot]], Awaitable[None]]): Awaited with each
+                chunk of results, in completion order.
 
         Returns:
-            list[dict[str, str | int]]: A list of processed URL data.
+            dict[str, int]: The number of URLs that were processed, unchanged, failed and
+            without content.
         """
-        urls_content = await fetch_all_urls(urls_batch, concurrent)
-        return [self._process_url_result(result) for result in urls_content]
+        logger.info("Starting to fetch and clean URLs", total=len(urls))
 
-    def _process_url_result(self, result: dict) -> dict[str, str | int]:
+        known_raw_hashes = known_raw_hashes or {}
+        session = await self._get_session(concurrent)
+        loop = asyncio.get_running_loop()
+        counts = {"processed": 0, "unchanged": 0, "without_content": 0}
+
+        # Small snapshots use smaller chunks so they are still spread over all workers
+        chunk_size = max(
+            1, min(_CLEAN_CHUNK_SIZE, len(urls) // (self._cpu_workers * 4))
+        )
+
+        async def hand_over(results):
+            counts["processed"] += len(results)
+            counts["without_content"] += sum(
+                not result.content_hash for result in results
+            )
+            await on_results(results)
+
+        async def clean(chunk):
+            await hand_over(
+                await loop.run_in_executor(self._cpu, _clean_and_hash_chunk, chunk)
+            )
+
+        async def hand_over_unchanged():
+            counts["unchanged"] += len(unchanged)
+            results = self._reuse_cleaned_content(unchanged)
+            unchanged.clear()
+            await hand_over(results)
+
+        async def start_cleaning(chunk):
+            cleaning.append(asyncio.ensure_future(clean(chunk)))
+            while cleaning and cleaning[0].done():
+                cleaning.popleft().result()
+            if len(cleaning) >= max_in_flight:
+                await cleaning.popleft()
+
+        # Pages are handed off as they arrive, so at most the pages in flight, the
+        # chunks in flight and a batch of unchanged pages are held here at any time
+        max_in_flight = self._cpu_workers * _CHUNKS_IN_FLIGHT_PER_WORKER
+        cleaning = deque()
+        chunk = []
+        unchanged = []
+        try:
+            async for result in fetch_all_urls(urls, concurrent, session=session):
+                url = result["url"]
+                if result["content"]:
+                    raw_hash = hash_raw_content(result["content"])
+                    known = known_raw_hashes.get(url)
+                    if known and known[0] == raw_hash:
+                        unchanged.append((url, result["http_code"], raw_hash, known))
+                        if len(unchanged) >= _SAVE_BATCH_SIZE:
+                            await hand_over_unchanged()
+                        continue
+                    result["raw_hash"] = raw_hash
+
+                chunk.append(result)
+                if len(chunk) >= chunk_size:
+                    await start_cleaning(chunk)
+                    chunk = []
+        except asyncio.CancelledError:
+            for task in cleaning:
+                task.cancel()
+            raise
+        except Exception:
+            # Hand over the pages fetched so far before giving up
+            if chunk:
+                cleaning.append(asyncio.ensure_future(clean(chunk)))
+            await asyncio.gather(*cleaning, return_exceptions=True)
+            if unchanged:
+                await hand_over_unchanged()
+            raise
+
+        if chunk:
+            cleaning.append(asyncio.ensure_future(clean(chunk)))
+
+        # Copy the cleaned content of unchanged pages while the workers clean the rest
+        try:
+            if unchanged:
+                await hand_over_unchanged()
+            await asyncio.gather(*cleaning)
+        except BaseException:
+            for task in cleaning:
+                task.cancel()
+            raise
+
+        # One summary record instead of a record per URL
+        counts["failed"] = len(urls) - counts["processed"]
+        logger.info("Fetched and cleaned URLs", total=len(urls), **counts)
+        return counts
+
+    def _reuse_cleaned_content(
+        self, unchanged: list[tuple[str, int, bytes, tuple[bytes, bytes, int]]]
+    ) -> list[URLSnapshot]:
         """
-        Process the result of a fetched URL by cleaning its content and generating a content hash.
+        Build the results of a batch of pages whose raw content matches an earlier snapshot.
+
+        The cleaned content is loaded with one query per earlier snapshot involved.
 
         Args:
-            result (dict): A dictionary containing URL fetch details.
+            unchanged (list[tuple[str, int, bytes, tuple[bytes, bytes, int]]]): The URL, HTTP code,
+                raw hash and earlier (raw hash, content hash, snapshot ID) of each page.
 
         Returns:
-            dict[str, str | int]: A dictionary with URL details including HTTP code, content hash,
-                                  and cleaned full content.
+            list[URLSnapshot]: The results of the unchanged pages.
         """
-        url = result.get("url", "")
-        http_code = result.get("status") or result.get("http_code", "Unknown")
-        content = result.get("content", "")
+        urls_by_snapshot = defaultdict(list)
+        for url, _, _, (_, _, snapshot_id) in unchanged:
+            urls_by_snapshot[snapshot_id].append(url)
 
-        try:
-            if content:
-                cleaned_content = clean_content(content, url)
-                content_hash = hash_content(cleaned_content)
-                logger.info("Processed URL", url=url, http_code=http_code)
-                return {
-                    "url": url,
-                    "http_code": http_code,
-                    "content_hash": content_hash,
-                    "full_content": cleaned_content,
-                }
-            else:
-                logger.warning("No content for URL", url=url, http_code=http_code)
-                return {
-                    "url": url,
-                    "http_code": http_code,
-                    "content_hash": "",
-                    "full_content": "",
-                }
-        except Exception as e:
-            self._log_exception(
-                f"Error processing URL: {url}", e, {"http_code": http_code}
+        contents = {}
+        for snapshot_id, snapshot_urls in urls_by_snapshot.items():
+            contents.update(
+                self.db_manager.get_full_content(
+                    snapshot_id, snapshot_urls, decode=False
+                )
             )
-            return {
-                "url": url,
-                "http_code": http_code,
-                "content_hash": "",
-                "full_content": "",
-            }
+
+        return [
+            URLSnapshot(url, http_code, content_hash, contents[url], raw_hash)
+            for url, http_code, raw_hash, (_, content_hash, _) in unchanged
+        ]
 
     def compare_snapshots(
         self, snapshot1_id: int, snapshot2_id: int
@@ -228,6 +793,9 @@ class SnapshotManager:
         """
         Compare two snapshots and return the differences.
 
+        The differences of a pair of snapshots are memoized, so repeating a comparison, in
+        either order, only loads the content of the changed URLs again.
+
         Args:
             snapshot1_id (int): The ID of the first snapshot.
             snapshot2_id (int): The ID of the second snapshot.
@@ -237,67 +805,295 @@ class SnapshotManager:
                                   between the two snapshots.
         """
         try:
-            snapshot1_data = self.db_manager.get_snapshot_data(snapshot1_id)
-            snapshot2_data = self.db_manager.get_snapshot_data(snapshot2_id)
+            differences = self._get_differences(snapshot1_id, snapshot2_id)
+            logger.info(
+                "Compared snapshots",
+                changed=len(differences),
+                urls=[diff["url"] for diff in differences[:_LOGGED_URLS]],
+            )
+
+            # Snapshots are usually browsed by comparing the newer snapshot with older
+            # and older ones, so the next of those comparisons is prefetched
+            older_id, newer_id = sorted((snapshot1_id, snapshot2_id))
+            if older_id > 1 and not self.db_manager.use_in_memory_db:
+                self._prefetch_differences(older_id - 1, newer_id)
+
+            # Only the content of changed URLs is loaded from the database
+            if differences:
+                changed_urls = [diff["url"] for diff in differences]
+                contents1, contents2 = self._load_pair(
+                    self.db_manager.get_full_content,
+                    snapshot1_id,
+                    snapshot2_id,
+                    changed_urls,
+                )
+                for diff in differences:
+                    diff["snapshot1_full_content"] = contents1.get(diff["url"], "N/A")
+                    diff["snapshot2_full_content"] = contents2.get(diff["url"], "N/A")
         except Exception as e:
             self._log_exception("Error retrieving snapshots", e)
             return []
 
-        return self._find_differences(snapshot1_data, snapshot2_data)
+        return differences
 
-    def _find_differences(
-        self, snapshot1_data: list[dict[str, str]], snapshot2_data: list[dict[str, str]]
+    def _get_differences(
+        self, snapshot1_id: int, snapshot2_id: int
     ) -> list[dict[str, str]]:
         """
-        Compare two snapshots and find differences between them.
+        Return the differences of two snapshots, reusing a memoized or prefetched result.
+
+        Differences are memoized per unordered pair of snapshots; for the reversed order
+        the snapshot1 and snapshot2 fields are swapped. Stored snapshots never change, so
+        a result stays valid until the cache is cleared. A failed prefetch is retried on
+        the calling thread.
 
         Args:
-            snapshot1_data (list[dict[str, str]]): The first snapshot data.
-            snapshot2_data (list[dict[str, str]]): The second snapshot data.
+            snapshot1_id (int): The ID of the first snapshot.
+            snapshot2_id (int): The ID of the second snapshot.
 
         Returns:
-            list[dict[str, str]]: A list of dictionaries, each representing a URL with differences between the two snapshots.
-        """
-        differences = []
-
-        # Convert list of dicts to dict with URL as key for faster comparison
-        snapshot1_dict = {
-            entry["url"]: URLSnapshot(**entry) for entry in snapshot1_data
-        }
-        snapshot2_dict = {
-            entry["url"]: URLSnapshot(**entry) for entry in snapshot2_data
-        }
-
-        all_urls = set(snapshot1_dict.keys()).union(snapshot2_dict.keys())
-
-        for url in all_urls:
-            data1 = snapshot1_dict.get(url)
-            data2 = snapshot2_dict.get(url)
-
-            # Compare URL snapshots
-            if not data1 or not data2 or data1.is_different(data2):
-                differences.append(
-                    {
-                        "url": url,
-                        "snapshot1_http_code": data1.http_code if data1 else "N/A",
-                        "snapshot2_http_code": data2.http_code if data2 else "N/A",
-                        "snapshot1_content_hash": (
-                            data1.content_hash if data1 else "N/A"
-                        ),
-                        "snapshot2_content_hash": (
-                            data2.content_hash if data2 else "N/A"
-                        ),
-                        "snapshot1_full_content": (
-                            escape(data1.full_content) if data1 else "N/A"
-                        ),
-                        "snapshot2_full_content": (
-                            escape(data2.full_content) if data2 else "N/A"
-                        ),
-                    }
-                )
-                logger.info("URL has changed", url=url)
+            list[dict[str, str]]: New dictionaries with the differences, without content.
+        """
+        key = (min(snapshot1_id, snapshot2_id), max(snapshot1_id, snapshot2_id))
 
-        return differences
+        differences = None
+        future = self._diff_futures.get(key)
+        if future is not None:
+            try:
+                differences = future.result()
+            except Exception as e:
+                self._log_exception("Prefetching differences failed", e)
+
+        if differences is None:
+            differences = self._compute_differences(*key)
+            future = Future()
+            future.set_result(differences)
+
+        self._remember_differences(key, future)
+
+        # Copied, since the memoized dictionaries must not receive the content
+        if snapshot1_id > snapshot2_id:
+            return list(map(_swap_sides, differences))
+        return [dict(diff) for diff in differences]
+
+    def _prefetch_differences(self, snapshot1_id: int, snapshot2_id: int):
+        """
+        Start computing the differences of two snapshots in the background, unless known.
+
+        Must not be used with in-memory databases, which are not shared between threads.
+
+        Args:
+            snapshot1_id (int): The ID of the older snapshot.
+            snapshot2_id (int): The ID of the newer snapshot.
+        """
+        key = (snapshot1_id, snapshot2_id)
+        if key not in self._diff_futures:
+            self._remember_differences(
+                key, self._prefetcher.submit(self._compute_differences, *key)
+            )
+
+    def _remember_differences(self, key: tuple[int, int], future: Future):
+        """
+        Memoize the differences of a pair of snapshots as the most recently used ones.
+
+        Only the _DIFF_CACHE_SIZE most recently used pairs are kept.
+
+        Args:
+            key (tuple[int, int]): The IDs of the older and the newer snapshot.
+            future (Future): The future of the differences.
+        """
+        self._diff_futures[key] = future
+        self._diff_futures.move_to_end(key)
+        if len(self._diff_futures) > _DIFF_CACHE_SIZE:
+            self._diff_futures.popitem(last=False)
+
+    def _compute_differences(
+        self, snapshot1_id: int, snapshot2_id: int
+    ) -> list[dict[str, str]]:
+        """
+        Find the URLs that differ between two snapshots, without their content.
+
+        Hashes are only comparable when both snapshots used the same algorithm, so the
+        differences are found in SQL unless the snapshots have to be rehashed. Snapshots
+        with the same digest are identical and are not compared row by row.
+
+        Args:
+            snapshot1_id (int): The ID of the first snapshot.
+            snapshot2_id (int): The ID of the second snapshot.
+
+        Returns:
+            list[dict[str, str]]: The differences between the two snapshots.
+        """
+        algorithm1 = self.db_manager.get_hash_algorithm(snapshot1_id)
+        algorithm2 = self.db_manager.get_hash_algorithm(snapshot2_id)
+        if algorithm1 == algorithm2:
+            digest1 = self.db_manager.get_snapshot_digest(snapshot1_id)
+            if digest1 is not None and digest1 == self.db_manager.get_snapshot_digest(
+                snapshot2_id
+            ):
+                logger.debug("Snapshot digests match, skipping the comparison.")
+                return []
+            return self.db_manager.diff_snapshots(snapshot1_id, snapshot2_id)
+
+        algorithm = next(
+            (a for a in (algorithm2, algorithm1) if a in HASH_FUNCTIONS),
+            LEGACY_HASH_ALGORITHM,
+        )
+        logger.info(
+            "Rehashing snapshot content to compare",
+            algorithm1=algorithm1,
+            algorithm2=algorithm2,
+            algorithm=algorithm,
+        )
+        # Differences are memoized and walked more than once, so they are materialized
+        return list(
+            self._iter_differences(
+                self._iter_fingerprints(snapshot1_id, algorithm1, algorithm),
+                self._iter_fingerprints(snapshot2_id, algorithm2, algorithm),
+            )
+        )
+
+    def _load_cached(self, snapshot_id: int) -> list:
+        """
+        Return the data of a snapshot without content from the in-memory cache, loading
+        it on a miss.
+
+        Only the _SNAPSHOT_CACHE_SIZE most recently used snapshots are kept. Cached data
+        is shared between callers and must not be modified.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+
+        Returns:
+            list: The URL snapshots of the snapshot.
+        """
+        if snapshot_id in self._snapshot_cache:
+            self._snapshot_cache.move_to_end(snapshot_id)
+            return self._snapshot_cache[snapshot_id]
+
+        data = self.db_manager.get_snapshot_data(snapshot_id)
+
+        self._snapshot_cache[snapshot_id] = data
+        if len(self._snapshot_cache) > _SNAPSHOT_CACHE_SIZE:
+            self._snapshot_cache.popitem(last=False)
+
+        return data
+
+    def _clear_snapshot_cache(self):
+        """
+        Drop all cached snapshot data and differences, so they are reloaded after the
+        database changed.
+        """
+        self._snapshot_cache.clear()
+        self._diff_futures.clear()
+
+    def _load_pair(self, load, snapshot1_id: int, snapshot2_id: int, *args) -> tuple:
+        """
+        Load the same data for two snapshots, with both queries running concurrently.
+
+        SQLite releases the GIL while it executes a query, so the second snapshot is read
+        while the first one is. In-memory databases are not shared between threads, so
+        they are read sequentially.
+
+        Args:
+            load (Callable): The DatabaseManager method to call with each snapshot ID.
+            snapshot1_id (int): The ID of the first snapshot.
+            snapshot2_id (int): The ID of the second snapshot.
+            *args: Additional arguments passed to load after the snapshot ID.
+
+        Returns:
+            tuple: The results of load for the first and the second snapshot.
+        """
+        if self.db_manager.use_in_memory_db:
+            return load(snapshot1_id, *args), load(snapshot2_id, *args)
+
+        future2 = self._db_io.submit(load, snapshot2_id, *args)
+        return load(snapshot1_id, *args), future2.result()
+
+    def _iter_fingerprints(
+        self, snapshot_id: int, stored_algorithm: str, algorithm: str
+    ) -> Iterator[tuple[str, tuple[int, bytes]]]:
+        """
+        Stream the (http_code, content_hash) fingerprint of each URL of a snapshot, in URL order.
+
+        If the snapshot was hashed with another algorithm, its content is streamed along and
+        rehashed by the worker processes. The stored full content is the cleaned content the
+        original hash was created from, so the new hash is equivalent. URLs without content
+        keep their empty hash.
+
+        Args:
+            snapshot_id (int): The ID of the snapshot.
+            stored_algorithm (str): The algorithm the snapshot was hashed with.
+            algorithm (str): The name of the hash algorithm to compare with.
+
+        Yields:
+            tuple[str, tuple[int, bytes]]: The URL and its fingerprint.
+        """
+        if stored_algorithm == algorithm:
+            for url, http_code, content_hash in self.db_manager.iter_snapshot_rows(
+                snapshot_id
+            ):
+                yield url, (http_code, content_hash)
+            return
+
+        rows = self.db_manager.iter_snapshot_rows(
+            snapshot_id, with_content=True, decompress=False
+        )
+        # Chunks are rehashed by the worker processes in URL order. Only a few chunks per
+        # worker are in flight, so the snapshot is still never loaded all at once.
+        pending = deque()
+        while chunk := list(map(tuple, islice(rows, _REHASH_CHUNK_SIZE))):
+            pending.append(self._cpu.submit(_rehash_chunk, chunk, algorithm))
+            if len(pending) >= self._cpu_workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _iter_differences(
+        self,
+        fingerprints1: Iterable[tuple[str, tuple[int, bytes]]],
+        fingerprints2: Iterable[tuple[str, tuple[int, bytes]]],
+    ) -> Iterator[dict[str, str]]:
+        """
+        Compare two snapshots and yield the differences between them.
+
+        Both snapshots are walked side by side in URL order, like a merge join, so only the
+        current row of each is held in memory. Differences are yielded as they are found.
+        A URL listed more than once in a snapshot is compared once.
+
+        Args:
+            fingerprints1 (Iterable[tuple[str, tuple[int, bytes]]]): The URL and
+                (http_code, content_hash) of each URL in the first snapshot, sorted by URL.
+            fingerprints2 (Iterable[tuple[str, tuple[int, bytes]]]): The same for the
+                second snapshot.
+
+        Yields:
+            dict[str, str]: A URL with differences between the two snapshots, in URL order.
+            The full content of the URLs is not included.
+        """
+        # A URL that is missing from one snapshot gets an N/A fingerprint there
+        missing = ("N/A", "N/A")
+        exhausted = (None, None)
+
+        rows1 = _last_per_url(fingerprints1)
+        rows2 = _last_per_url(fingerprints2)
+        url1, fingerprint1 = next(rows1, exhausted)
+        url2, fingerprint2 = next(rows2, exhausted)
+
+        while url1 is not None or url2 is not None:
+            if url2 is None or (url1 is not None and url1 < url2):
+                # Only in the first snapshot
+                yield _difference(url1, fingerprint1, missing)
+                url1, fingerprint1 = next(rows1, exhausted)
+            elif url1 is None or url2 < url1:
+                # Only in the second snapshot
+                yield _difference(url2, missing, fingerprint2)
+                url2, fingerprint2 = next(rows2, exhausted)
+            else:
+                if fingerprint1 != fingerprint2:
+                    yield _difference(url1, fingerprint1, fingerprint2)
+                url1, fingerprint1 = next(rows1, exhausted)
+                url2, fingerprint2 = next(rows2, exhausted)
 
     def _log_exception(self, message: str, exception: Exception, extra: dict = None):
         """
@@ -309,3 +1105,17 @@ class SnapshotManager:
             extra (dict, optional): Additional context to include in the log entry.
         """
         logger.error(message, error=str(exception), **(extra or {}))
+
+
+@lru_cache(maxsize=1)
+def get_snapshot_manager() -> SnapshotManager:
+    """
+    Return the process-wide SnapshotManager, creating it on first use.
+
+    Returns:
+        SnapshotManager: The shared SnapshotManager backed by the shared DatabaseManager.
+    """
+
+    snapshot_manager = SnapshotManager(get_database_manager())
+    atexit.register(snapshot_manager.close)
+    return snapshot_manager
@@ -0,0 +1,82 @@
+# url_snapshotter/tests/conftest.py
+
+# This module provides the fixtures shared by the tests.
+
+import asyncio
+
+import pytest
+
+import url_snapshotter.snapshot_manager as snapshot_manager_module
+from url_snapshotter.db_utils import DatabaseManager
+from url_snapshotter.snapshot_manager import SnapshotManager
+
+
+class FakeFetcher:
+    """
+    Replaces fetch_all_urls() with pages served from memory.
+
+    Attributes:
+        pages (dict[str, str]): The content served for each URL. URLs without an entry
+            fail to fetch and are skipped, like URLs that fail after all retries.
+        fail_after (int | None): The number of pages after which fetching raises a
+            ConnectionError, or None to never fail.
+        delay (float): The time in seconds each fetch takes.
+        fetched (list[str]): The URLs fetched so far, in order.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.fail_after = None
+        self.delay = 0
+        self.fetched = []
+
+    async def fetch_all_urls(self, urls, concurrent, max_retries=3, session=None):
+        for url in urls:
+            if self.fail_after is not None and len(self.fetched) >= self.fail_after:
+                raise ConnectionError("Network is unreachable")
+            await asyncio.sleep(self.delay)
+            self.fetched.append(url)
+            if url in self.pages:
+                yield {
+                    "url": url,
+                    "http_code": 200,
+                    "content": self.pages[url].encode("utf-8"),
+                    "encoding": "utf-8",
+                }
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    """
+    Provide a DatabaseManager backed by a new snapshots.db file in a temporary directory.
+    """
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("USE_IN_MEMORY_DB", raising=False)
+    db_manager = DatabaseManager()
+    yield db_manager
+    db_manager.engine.dispose()
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    """
+    Provide a FakeFetcher that serves the pages fetched by the SnapshotManager.
+    """
+
+    fetcher = FakeFetcher()
+    monkeypatch.setattr(
+        snapshot_manager_module, "fetch_all_urls", fetcher.fetch_all_urls
+    )
+    return fetcher
+
+
+@pytest.fixture
+def snapshot_manager(db_manager, fetcher):
+    """
+    Provide a SnapshotManager on the temporary database that fetches from the fetcher.
+    """
+
+    snapshot_manager = SnapshotManager(db_manager)
+    yield snapshot_manager
+    snapshot_manager.close()
@@ -0,0 +1,240 @@
+# url_snapshotter/tests/test_db_utils.py
+
+# This module tests saving snapshots and upgrading databases created by older versions of
+# the DatabaseManager.
+
+import hashlib
+import sqlite3
+
+import pytest
+
+from url_snapshotter.content_utils import (
+    compress_content,
+    decompress_content,
+    hash_content,
+    hash_snapshot,
+)
+from url_snapshotter.db_utils import _SCHEMA_VERSION, DatabaseManager
+from url_snapshotter.snapshot_manager import SnapshotManager, URLSnapshot
+
+# Tables as created before hashes were stored as raw digests, content as compressed
+# blobs, and snapshots recorded their hash algorithm, digest and partial state
+_OLD_SCHEMA = """
+CREATE TABLE snapshots (
+    snapshot_id INTEGER NOT NULL,
+    name VARCHAR NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (snapshot_id)
+);
+CREATE TABLE url_snapshots (
+    id INTEGER NOT NULL,
+    snapshot_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    http_code INTEGER,
+    content_hash VARCHAR NOT NULL,
+    full_content TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(snapshot_id) REFERENCES snapshots (snapshot_id) ON DELETE CASCADE
+);
+"""
+
+# The (url, http_code, full_content) of each URL of the stored snapshots. URLs were not
+# de-duplicated, and the last row of a URL is the one that counts.
+_OLD_SNAPSHOTS = {
+    1: [
+        ("https://example.com/a", 500, "<p>Error</p>"),
+        ("https://example.com/a", 200, "<p>Grüße</p>"),
+        ("https://example.com/b", 404, "<p>Not found</p>"),
+        ("https://example.com/c", None, ""),
+    ],
+    2: [
+        ("https://example.com/a", 200, "<p>Grüße</p>"),
+        ("https://example.com/b", 404, "<p>Not found</p>"),
+        ("https://example.com/c", None, ""),
+    ],
+    3: [
+        ("https://example.com/a", 200, "<p>Hi</p>"),
+        ("https://example.com/b", 404, "<p>Not found</p>"),
+        ("https://example.com/a", 200, "<p>Hello</p>"),
+    ],
+}
+
+
+def _kept_rows(rows: list[tuple]) -> list[tuple]:
+    """
+    Return the rows of a snapshot that remain after upgrading, in their stored order.
+
+    Args:
+        rows (list[tuple]): The (url, http_code, full_content) of each stored row.
+
+    Returns:
+        list[tuple]: The last row of each URL.
+    """
+
+    last_index = {row[0]: index for index, row in enumerate(rows)}
+    return [row for index, row in enumerate(rows) if last_index[row[0]] == index]
+
+
+def _hex_hash(content: str) -> str:
+    """
+    Hash content the way it was hashed before hashes were stored as raw digests.
+
+    Args:
+        content (str): The cleaned content.
+
+    Returns:
+        str: The hexadecimal SHA-256 hash, or an empty string for empty content.
+    """
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest() if content else ""
+
+
+@pytest.fixture
+def old_database(tmp_path, monkeypatch):
+    """
+    Create a snapshots.db in the oldest layout in a temporary working directory.
+    """
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("USE_IN_MEMORY_DB", raising=False)
+
+    connection = sqlite3.connect(tmp_path / "snapshots.db")
+    connection.executescript(_OLD_SCHEMA)
+    for snapshot_id, rows in _OLD_SNAPSHOTS.items():
+        connection.execute(
+            "INSERT INTO snapshots VALUES (?, ?, '2024-10-01 12:00:00')",
+            (snapshot_id, f"snapshot {snapshot_id}"),
+        )
+        connection.executemany(
+            "INSERT INTO url_snapshots "
+            "(snapshot_id, url, http_code, content_hash, full_content, created_at) "
+            "VALUES (?, ?, ?, ?, ?, '2024-10-01 12:00:00')",
+            [
+                (snapshot_id, url, http_code, _hex_hash(content), content)
+                for url, http_code, content in rows
+            ],
+        )
+    connection.commit()
+    connection.close()
+    return tmp_path / "snapshots.db"
+
+
+@pytest.fixture
+def upgraded(old_database):
+    """
+    Open the old database with a DatabaseManager, which upgrades it.
+    """
+
+    db_manager = DatabaseManager()
+    yield db_manager
+    db_manager.engine.dispose()
+
+
+def test_upgrade_converts_hashes_to_raw_digests(old_database, upgraded):
+    connection = sqlite3.connect(old_database)
+    rows = connection.execute(
+        "SELECT snapshot_id, url, content_hash FROM url_snapshots ORDER BY id"
+    ).fetchall()
+
+    expected = [
+        (snapshot_id, url, bytes.fromhex(_hex_hash(content)))
+        for snapshot_id, snapshot_rows in _OLD_SNAPSHOTS.items()
+        for url, _, content in _kept_rows(snapshot_rows)
+    ]
+    assert rows == expected
+    assert connection.execute("PRAGMA user_version").fetchone() == (_SCHEMA_VERSION,)
+
+
+def test_upgrade_compresses_content(old_database, upgraded):
+    connection = sqlite3.connect(old_database)
+    rows = connection.execute(
+        "SELECT snapshot_id, full_content FROM url_snapshots ORDER BY id"
+    ).fetchall()
+
+    contents = [
+        content
+        for snapshot_rows in _OLD_SNAPSHOTS.values()
+        for *_, content in _kept_rows(snapshot_rows)
+    ]
+    assert all(isinstance(stored, bytes) for _, stored in rows)
+    assert [decompress_content(stored).decode("utf-8") for _, stored in rows] == (
+        contents
+    )
+
+    entries = upgraded.get_snapshot_data(1, with_content=True)
+    assert [entry.full_content for entry in entries] == [
+        content for *_, content in _kept_rows(_OLD_SNAPSHOTS[1])
+    ]
+
+
+def test_upgrade_keeps_the_last_row_of_duplicate_urls(upgraded):
+    for snapshot_id, rows in _OLD_SNAPSHOTS.items():
+        entries = upgraded.get_snapshot_data(snapshot_id, with_content=True)
+
+        assert [
+            (entry.url, entry.http_code, entry.full_content) for entry in entries
+        ] == _kept_rows(rows)
+
+
+def test_upgrade_records_snapshot_digests(old_database, upgraded):
+    digests = {
+        snapshot_id: upgraded.get_snapshot_digest(snapshot_id)
+        for snapshot_id in _OLD_SNAPSHOTS
+    }
+
+    for snapshot_id, digest in digests.items():
+        assert digest == hash_snapshot(upgraded.get_snapshot_data(snapshot_id))
+    assert digests[1] == digests[2]
+    assert digests[1] != digests[3]
+
+    for snapshot in upgraded.get_snapshots():
+        assert snapshot.hash_algorithm == "sha256"
+        assert not snapshot.partial
+
+
+def test_upgraded_snapshots_can_be_compared(upgraded):
+    snapshot_manager = SnapshotManager(upgraded)
+    try:
+        assert snapshot_manager.compare_snapshots(1, 2) == []
+
+        differences = snapshot_manager.compare_snapshots(1, 3)
+    finally:
+        snapshot_manager.close()
+
+    assert [diff["url"] for diff in differences] == [
+        "https://example.com/a",
+        "https://example.com/c",
+    ]
+    assert differences[0]["snapshot1_full_content"] == "<p>Grüße</p>"
+    assert differences[0]["snapshot2_full_content"] == "<p>Hello</p>"
+
+
+def test_upgrade_runs_once(old_database, upgraded):
+    connection = sqlite3.connect(old_database)
+    before = connection.execute("SELECT * FROM url_snapshots ORDER BY id").fetchall()
+
+    DatabaseManager().engine.dispose()
+
+    after = connection.execute("SELECT * FROM url_snapshots ORDER BY id").fetchall()
+    assert after == before
+
+
+def test_save_snapshot_stores_a_complete_snapshot(db_manager):
+    urls = [
+        URLSnapshot(url, 200, hash_content(content), compress_content(content.encode()))
+        for url, content in [
+            ("https://example.com/a", "<p>A</p>"),
+            ("https://example.com/b", "<p>B</p>"),
+        ]
+    ]
+
+    snapshot_id = db_manager.save_snapshot("saved", urls)
+
+    snapshot = db_manager.get_snapshot(snapshot_id)
+    assert not snapshot.partial
+    assert snapshot.digest == hash_snapshot(urls)
+    assert db_manager.get_full_content(snapshot_id) == {
+        "https://example.com/a": "<p>A</p>",
+        "https://example.com/b": "<p>B</p>",
+    }
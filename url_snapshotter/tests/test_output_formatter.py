@@ -0,0 +1,124 @@
+# url_snapshotter/tests/test_output_formatter.py
+
+# This module tests the unified diff helper of the output formatter.
+
+import difflib
+import random
+import re
+
+import pytest
+
+from url_snapshotter.output_formatter import (
+    _DIFF_CONTEXT_LINES,
+    _DIFF_FROM_FILE,
+    _DIFF_TO_FILE,
+    _unified_diff,
+)
+
+# Start line and line count of both sides in a hunk header
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _apply_diff(lines1: list[str], diff_lines: list[str]) -> list[str]:
+    """
+    Apply a unified diff to the lines it was created from.
+
+    Context and removed lines are checked against the original, so a diff with wrong
+    hunk positions fails instead of producing other content.
+
+    Args:
+        lines1 (list[str]): The lines of the first content.
+        diff_lines (list[str]): The unified diff of the first and the second content.
+
+    Returns:
+        list[str]: The lines of the second content.
+    """
+
+    result = []
+    position = 0
+    for line in diff_lines[2:]:
+        if match := _HUNK.match(line):
+            start, count = int(match[1]), match[2]
+            # A hunk without lines of the first content starts after its start line
+            index = start if count == "0" else start - 1
+            assert index >= position
+            result.extend(lines1[position:index])
+            position = index
+        elif line.startswith("+"):
+            result.append(line[1:])
+        else:
+            assert lines1[position] == line[1:]
+            if line.startswith(" "):
+                result.append(line[1:])
+            position += 1
+    result.extend(lines1[position:])
+    return result
+
+
+def _random_edit(rng: random.Random, lines: list[str]) -> list[str]:
+    """
+    Apply a few random insertions, deletions and replacements to a list of lines.
+
+    Args:
+        rng (random.Random): The random number generator to use.
+        lines (list[str]): The lines to edit.
+
+    Returns:
+        list[str]: A new, edited list of lines.
+    """
+
+    edited = list(lines)
+    for _ in range(rng.randint(1, 4)):
+        index = rng.randint(0, len(edited))
+        new_lines = [f"new {rng.randint(0, 5)}" for _ in range(rng.randint(0, 3))]
+        removed = rng.randint(0, min(3, len(edited) - index))
+        edited[index : index + removed] = new_lines
+    return edited
+
+
+def test_unified_diff_of_identical_contents_is_empty():
+    lines = [f"line {i}" for i in range(20)]
+
+    assert list(_unified_diff(lines, list(lines))) == []
+
+
+def test_unified_diff_without_common_prefix_matches_difflib():
+    lines1 = ["a", "b", "c", "d"]
+    lines2 = ["x", "b", "c", "y"]
+
+    expected = difflib.unified_diff(
+        lines1,
+        lines2,
+        fromfile=_DIFF_FROM_FILE,
+        tofile=_DIFF_TO_FILE,
+        lineterm="",
+        n=_DIFF_CONTEXT_LINES,
+    )
+    assert list(_unified_diff(lines1, lines2)) == list(expected)
+
+
+def test_unified_diff_shifts_hunk_headers_to_full_file_line_numbers():
+    lines1 = [f"line {i}" for i in range(1, 101)]
+    lines2 = list(lines1)
+    lines2[49] = "changed"
+
+    diff_lines = list(_unified_diff(lines1, lines2))
+
+    assert diff_lines[2] == "@@ -47,7 +47,7 @@"
+    assert "-line 50" in diff_lines
+    assert "+changed" in diff_lines
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_unified_diff_applies_back_to_the_second_content(seed):
+    rng = random.Random(seed)
+    for _ in range(100):
+        lines1 = [f"line {rng.randint(0, 8)}" for _ in range(rng.randint(0, 40))]
+        lines2 = _random_edit(rng, lines1)
+
+        diff_lines = list(_unified_diff(lines1, lines2))
+
+        if lines1 == lines2:
+            assert diff_lines == []
+        else:
+            assert _apply_diff(lines1, diff_lines) == lines2
@@ -0,0 +1,172 @@
+# url_snapshotter/tests/test_snapshot_manager.py
+
+# This module tests creating and comparing snapshots with the SnapshotManager.
+
+import time
+
+import pytest
+
+import url_snapshotter.snapshot_manager as snapshot_manager_module
+from url_snapshotter.content_utils import hash_snapshot
+
+URLS = [f"https://example.com/{i}" for i in range(10)]
+
+
+def _serve(fetcher, urls, version="v1"):
+    for url in urls:
+        fetcher.pages[url] = f"<p>{url} {version}</p>"
+
+
+def test_create_snapshot_stores_duplicate_urls_once(snapshot_manager, fetcher):
+    _serve(fetcher, URLS)
+    snapshot1_id = snapshot_manager.create_snapshot(URLS + URLS[:3], "first", 4)
+
+    fetcher.pages[URLS[0]] = "<p>changed</p>"
+    snapshot2_id = snapshot_manager.create_snapshot([URLS[0], *URLS], "second", 4)
+
+    db_manager = snapshot_manager.db_manager
+    assert fetcher.fetched.count(URLS[0]) == 2
+    assert len(db_manager.get_snapshot_data(snapshot1_id)) == len(URLS)
+    assert len(db_manager.get_snapshot_data(snapshot2_id)) == len(URLS)
+
+    differences = snapshot_manager.compare_snapshots(snapshot1_id, snapshot2_id)
+    assert [diff["url"] for diff in differences] == [URLS[0]]
+
+
+def test_iter_differences_compares_duplicate_urls_once(snapshot_manager):
+    fingerprints1 = [
+        ("https://a/1", (200, b"old")),
+        ("https://a/1", (200, b"new")),
+        ("https://a/2", (200, b"same")),
+    ]
+    fingerprints2 = [
+        ("https://a/1", (200, b"new")),
+        ("https://a/2", (200, b"same")),
+        ("https://a/2", (404, b"gone")),
+        ("https://a/3", (200, b"added")),
+    ]
+
+    differences = list(snapshot_manager._iter_differences(fingerprints1, fingerprints2))
+
+    assert differences == [
+        {
+            "url": "https://a/2",
+            "snapshot1_http_code": 200,
+            "snapshot2_http_code": 404,
+            "snapshot1_content_hash": b"same",
+            "snapshot2_content_hash": b"gone",
+        },
+        {
+            "url": "https://a/3",
+            "snapshot1_http_code": "N/A",
+            "snapshot2_http_code": 200,
+            "snapshot1_content_hash": "N/A",
+            "snapshot2_content_hash": b"added",
+        },
+    ]
+
+
+def test_failed_crawl_leaves_a_partial_snapshot(snapshot_manager, fetcher):
+    _serve(fetcher, URLS)
+    fetcher.fail_after = 6
+
+    with pytest.raises(RuntimeError, match="left partial"):
+        snapshot_manager.create_snapshot(URLS, "interrupted", 4)
+
+    db_manager = snapshot_manager.db_manager
+    (snapshot,) = db_manager.get_snapshots()
+    assert snapshot.partial
+    assert snapshot.digest is None
+    assert db_manager.get_stored_urls(snapshot.snapshot_id) == set(URLS[:6])
+
+
+def test_resume_fetches_only_missing_urls(snapshot_manager, fetcher):
+    _serve(fetcher, URLS)
+    fetcher.fail_after = 6
+    with pytest.raises(RuntimeError):
+        snapshot_manager.create_snapshot(URLS, "interrupted", 4)
+    (snapshot,) = snapshot_manager.db_manager.get_snapshots()
+
+    fetcher.fail_after = None
+    fetcher.fetched.clear()
+    snapshot_id = snapshot_manager.create_snapshot(
+        URLS, "ignored", 4, resume_from=snapshot.snapshot_id
+    )
+
+    db_manager = snapshot_manager.db_manager
+    resumed = db_manager.get_snapshot(snapshot_id)
+    assert snapshot_id == snapshot.snapshot_id
+    assert fetcher.fetched == URLS[6:]
+    assert not resumed.partial
+    assert resumed.name == "interrupted"
+    assert resumed.digest == hash_snapshot(db_manager.get_snapshot_data(snapshot_id))
+
+    complete_id = snapshot_manager.create_snapshot(URLS, "complete", 4)
+    assert db_manager.get_snapshot_digest(complete_id) == resumed.digest
+    assert snapshot_manager.compare_snapshots(snapshot_id, complete_id) == []
+
+
+def test_resume_rejects_a_complete_snapshot(snapshot_manager, fetcher):
+    _serve(fetcher, URLS)
+    snapshot_id = snapshot_manager.create_snapshot(URLS, "complete", 4)
+
+    with pytest.raises(ValueError, match="already complete"):
+        snapshot_manager.create_snapshot(URLS, "again", 4, resume_from=snapshot_id)
+
+
+def test_resume_rejects_another_hash_algorithm(snapshot_manager, fetcher):
+    db_manager = snapshot_manager.db_manager
+    snapshot_id = db_manager.start_snapshot("old", hash_algorithm="md5")
+
+    with pytest.raises(ValueError, match="hashed with md5"):
+        snapshot_manager.create_snapshot(URLS, "old", 4, resume_from=snapshot_id)
+    assert fetcher.fetched == []
+
+
+def test_failed_store_stops_fetching(snapshot_manager, fetcher, monkeypatch):
+    urls = [f"https://example.com/page/{i}" for i in range(200)]
+    _serve(fetcher, urls)
+    fetcher.delay = 0.01
+    monkeypatch.setattr(snapshot_manager_module, "_SAVE_BATCH_SIZE", 1)
+
+    def add_url_snapshots(snapshot_id, batch):
+        raise OSError("database or disk is full")
+
+    monkeypatch.setattr(
+        snapshot_manager.db_manager, "add_url_snapshots", add_url_snapshots
+    )
+
+    with pytest.raises(RuntimeError, match="disk is full"):
+        snapshot_manager.create_snapshot(urls, "full disk", 4)
+    assert len(fetcher.fetched) < len(urls) // 2
+
+
+def test_slow_store_slows_down_fetching(snapshot_manager, fetcher, monkeypatch):
+    urls = [f"https://example.com/page/{i}" for i in range(400)]
+    _serve(fetcher, urls)
+    monkeypatch.setattr(snapshot_manager_module, "_CLEAN_CHUNK_SIZE", 8)
+    monkeypatch.setattr(snapshot_manager_module, "_SAVE_BATCH_SIZE", 1)
+    monkeypatch.setattr(snapshot_manager_module, "_STORE_QUEUE_SIZE", 1)
+    monkeypatch.setattr(snapshot_manager, "_cpu_workers", 1)
+
+    db_manager = snapshot_manager.db_manager
+    add_url_snapshots = db_manager.add_url_snapshots
+    stored = 0
+    pending = []
+
+    def slow_add_url_snapshots(snapshot_id, batch):
+        nonlocal stored
+        pending.append(len(fetcher.fetched) - stored)
+        time.sleep(0.005)
+        add_url_snapshots(snapshot_id, batch)
+        stored += len(batch)
+
+    monkeypatch.setattr(db_manager, "add_url_snapshots", slow_add_url_snapshots)
+
+    snapshot_id = snapshot_manager.create_snapshot(urls, "slow disk", 4)
+
+    # The chunk being stored, the queued chunk, the chunks in flight and the chunk
+    # being filled
+    chunks = 3 + snapshot_manager_module._CHUNKS_IN_FLIGHT_PER_WORKER
+    assert max(pending) <= chunks * 8
+    assert len(db_manager.get_snapshot_data(snapshot_id)) == len(urls)